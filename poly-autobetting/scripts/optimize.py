@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Parameter optimizer - sweeps strategy configs over historical markets
+
+Usage:
+    python scripts/optimize.py data/markets.json --entry 0.40:0.50:0.01 \
+        --max-positions 5,10,20 --stop-loss none,0.05,0.10 --size 1,5,10
+"""
+import argparse
+import json
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.bot.optimizer import Optimizer, ParameterSpace
+from src.bot.vector_backtest import MarketArrays
+
+
+def parse_values(text: str, cast=float) -> list:
+    """'a,b,c' or 'start:stop:step' (stop inclusive); 'none' -> None"""
+    if ':' in text:
+        start, stop, step = (float(v) for v in text.split(':'))
+        return [cast(round(v, 6)) for v in np.arange(start, stop + step / 2, step)]
+    return [None if v.strip().lower() == 'none' else cast(v) for v in text.split(',')]
+
+
+def load_data(path: str) -> MarketArrays:
+    """A directory of .npy columns or a JSON list of market records"""
+    if os.path.isdir(path):
+        return MarketArrays.load(path)
+    with open(path, 'r') as f:
+        return MarketArrays.from_records(json.load(f))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Grid/random search over strategy parameters")
+    parser.add_argument('data', help="Market dataset (.npy directory or JSON records)")
+    parser.add_argument('--entry', default='0.45', help="Entry prices")
+    parser.add_argument('--max-positions', default='10', help="Max concurrent positions")
+    parser.add_argument('--stop-loss', default='none', help="Stop distance below entry")
+    parser.add_argument('--size', default='1', help="Shares per leg")
+    parser.add_argument('--random', type=int, default=0, help="Sample N points instead of the full grid")
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--capital', type=float, default=1000.0)
+    parser.add_argument('--metric', default='sharpe', choices=['sharpe', 'total_profit', 'max_drawdown'])
+    parser.add_argument('--out', default='optimizer_results.csv')
+    parser.add_argument('--top', type=int, default=None, help="Only write the best N rows")
+    args = parser.parse_args()
+
+    space = ParameterSpace(
+        entry_prices=parse_values(args.entry),
+        max_positions=parse_values(args.max_positions, int),
+        stop_losses=parse_values(args.stop_loss),
+        sizes=parse_values(args.size)
+    )
+
+    data = load_data(args.data)
+    print(f"Loaded {len(data)} markets, {space.size} grid points")
+
+    optimizer = Optimizer(data, workers=args.workers, initial_capital=args.capital, metric=args.metric)
+    if args.random:
+        rows = optimizer.run_random(space, args.random, args.seed)
+    else:
+        rows = optimizer.run_grid(space)
+
+    optimizer.write_csv(args.out, args.top)
+    for row in rows[:5]:
+        print(
+            f"#{row['rank']}: entry={row['entry_price']:.2f} max_pos={row['max_positions']} "
+            f"stop={row['stop_loss']} size={row['size']:g} -> "
+            f"profit=${row['total_profit']:.2f} sharpe={row['sharpe']:.3f} dd={row['max_drawdown']:.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
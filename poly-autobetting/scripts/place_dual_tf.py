@@ -17,12 +17,22 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 from src.bot.client import ClobClientWrapper
 from src.bot.bot_config import BotConfig
 from src.bot.market_scheduler import MarketScheduler
+from src.bot.market_catalog import MarketCatalog
 from src.bot.position_tracker import PositionTracker
 from src.bot.order_engine import OrderEngine
 from src.bot.risk_engine import RiskEngine
 from src.bot.alerts import AlertManager
+from src.bot.token_cache import TokenCache
+from src.bot.recorder import MarketDataRecorder
+from src.bot.fill_monitor import FillMonitor
+from src.bot.user_feed import UserFillFeed
+from src.bot.order_book import OrderBookManager
+from src.bot.ws_book_feed import WebSocketBookFeed
+from src.bot.liquidity_model import LiquidityModel
+from src.bot.fixed_point import micros_to_float
 from src.api.gamma import GammaAPI
 from src.api.clob import ClobAPI
+from src.api.transport import close_transport
 from src.config import Config
 
 
@@ -34,6 +44,12 @@ class TimeframeConfig:
     buy_price_cents: int  # 48 for 5min, 45 for 15min
     max_positions: int
     enabled: bool = True
+    loop_interval: float = 10.0  # seconds between cycles
+    deadline: Optional[float] = None  # seconds into a cycle after which no new orders go out
+    
+    @property
+    def cycle_deadline(self) -> float:
+        return self.deadline if self.deadline is not None else self.loop_interval
     
     @property
     def buy_price(self) -> Decimal:
@@ -51,10 +67,30 @@ class DualTimeframeBot:
     
     def __init__(self):
         self.config = BotConfig()
-        self.client = ClobClientWrapper(self.config)
-        self.clob_api = ClobAPI()
+        self.token_cache = TokenCache()
+        self.client = ClobClientWrapper(self.config, token_cache=self.token_cache)
+        record_dir = os.getenv('MARKET_DATA_RECORD_DIR')
+        self.recorder = MarketDataRecorder(record_dir) if record_dir else None
+        self.clob_api = ClobAPI(recorder=self.recorder)
         self.gamma_api = GammaAPI()
+        self.market_catalog = MarketCatalog(gamma_api=self.gamma_api)
         self.alert_manager = AlertManager()
+        self.fill_monitor = FillMonitor()
+        self.user_feed: Optional[UserFillFeed] = None
+        if os.getenv('USER_FEED_ENABLED', 'true').lower() == 'true':
+            self.user_feed = UserFillFeed(
+                self.client,
+                fill_monitor=self.fill_monitor,
+                reconcile_interval=float(os.getenv('USER_FEED_RECONCILE_INTERVAL', '30'))
+            )
+        self.book_feed: Optional[WebSocketBookFeed] = None
+        self.liquidity: Optional[LiquidityModel] = None
+        if os.getenv('LIQUIDITY_MODEL_ENABLED', 'false').lower() == 'true':
+            self.book_manager = OrderBookManager(self.clob_api)
+            self.book_feed = WebSocketBookFeed()
+            self.book_feed.recorder = self.recorder
+            self.book_manager.attach(self.book_feed)
+            self.liquidity = LiquidityModel(self.book_manager)
         
         # Timeframe configurations
         self.timeframes: Dict[str, TimeframeConfig] = {
@@ -63,14 +99,16 @@ class DualTimeframeBot:
                 duration_minutes=5,
                 buy_price_cents=int(os.getenv('TF5_BUY_PRICE', '48')),
                 max_positions=int(os.getenv('TF5_MAX_POSITIONS', '10')),
-                enabled=os.getenv('ENABLE_5MIN', 'true').lower() == 'true'
+                enabled=os.getenv('ENABLE_5MIN', 'true').lower() == 'true',
+                loop_interval=float(os.getenv('TF5_LOOP_INTERVAL', '10'))
             ),
             "15min": TimeframeConfig(
                 name="15min",
                 duration_minutes=15,
                 buy_price_cents=int(os.getenv('TF15_BUY_PRICE', '45')),
                 max_positions=int(os.getenv('TF15_MAX_POSITIONS', '5')),
-                enabled=os.getenv('ENABLE_15MIN', 'true').lower() == 'true'
+                enabled=os.getenv('ENABLE_15MIN', 'true').lower() == 'true',
+                loop_interval=float(os.getenv('TF15_LOOP_INTERVAL', '10'))
             )
         }
         
@@ -83,6 +121,7 @@ class DualTimeframeBot:
         # State
         self.running = False
         self.loop_interval = 10  # seconds
+        self.cycle_overruns: Dict[str, int] = {}
         
     def initialize(self):
         """Initialize all components"""
@@ -106,42 +145,52 @@ class DualTimeframeBot:
             # Initialize per-timeframe components
             self.schedulers[tf_name] = MarketScheduler(
                 timeframe=tf_config.duration_minutes,
-                market_type="BTC"
+                market_type="BTC",
+                token_cache=self.token_cache,
+                catalog=self.market_catalog
             )
             self.position_trackers[tf_name] = PositionTracker(
                 timeframe_name=tf_name
             )
+            if self.user_feed:
+                self.user_feed.add_tracker(self.position_trackers[tf_name])
             self.order_engines[tf_name] = OrderEngine(
                 client=self.client,
                 buy_price=tf_config.buy_price,
-                timeframe_name=tf_name
+                timeframe_name=tf_name,
+                use_batch_post=os.getenv('ORDER_BATCH_POST', 'false').lower() == 'true'
             )
             self.risk_engines[tf_name] = RiskEngine(
                 max_positions=tf_config.max_positions,
-                timeframe_name=tf_name
+                timeframe_name=tf_name,
+                liquidity=self.liquidity,
+                min_fill_probability=float(os.getenv('MIN_FILL_PROBABILITY', '0.5'))
             )
         
         print("\n✅ Initialization complete")
         
     async def run(self):
-        """Main event loop"""
+        """Main event loop - one independent task per timeframe"""
         self.running = True
         print("\n🏃 Bot running. Press Ctrl+C to stop.\n")
         
+        if self.user_feed:
+            await self.user_feed.watch(
+                cid for tracker in self.position_trackers.values() for cid in tracker.open_positions
+            )
+            self.user_feed.start()
+        if self.liquidity:
+            self.book_feed.start()
+            self.liquidity.start()
+        
+        tasks = [
+            asyncio.create_task(self._run_timeframe(tf_name, tf_config), name=f"tf-{tf_name}")
+            for tf_name, tf_config in self.timeframes.items()
+            if tf_config.enabled
+        ]
+        
         try:
-            while self.running:
-                cycle_start = time.time()
-                
-                for tf_name, tf_config in self.timeframes.items():
-                    if not tf_config.enabled:
-                        continue
-                    
-                    await self._process_timeframe(tf_name, tf_config)
-                
-                # Sleep until next cycle
-                elapsed = time.time() - cycle_start
-                sleep_time = max(0, self.loop_interval - elapsed)
-                await asyncio.sleep(sleep_time)
+            await asyncio.gather(*tasks)
                 
         except asyncio.CancelledError:
             print("\n🛑 Bot stopped")
@@ -149,9 +198,58 @@ class DualTimeframeBot:
             print(f"\n❌ Fatal error: {e}")
             self.alert_manager.send_alert(f"Bot crashed: {e}")
             raise
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            if self.user_feed:
+                self.user_feed.stop()
+            if self.liquidity:
+                self.liquidity.stop()
+                self.book_feed.stop()
+            await close_transport()
+            if self.recorder:
+                self.recorder.close()
+            for tracker in self.position_trackers.values():
+                tracker.close()
     
-    async def _process_timeframe(self, tf_name: str, tf_config: TimeframeConfig):
-        """Process a single timeframe"""
+    async def _run_timeframe(self, tf_name: str, tf_config: TimeframeConfig):
+        """Run one timeframe on its own cadence"""
+        interval = tf_config.loop_interval or self.loop_interval
+        
+        while self.running:
+            cycle_start = time.monotonic()
+            
+            await self._process_timeframe(
+                tf_name, tf_config, deadline=cycle_start + tf_config.cycle_deadline
+            )
+            
+            # Sleep until next cycle
+            elapsed = time.monotonic() - cycle_start
+            if elapsed > interval:
+                self._report_overrun(tf_name, elapsed, interval)
+            await asyncio.sleep(max(0, interval - elapsed))
+    
+    def _report_overrun(self, tf_name: str, elapsed: float, interval: float):
+        """Report a cycle that took longer than its loop interval"""
+        self.cycle_overruns[tf_name] = self.cycle_overruns.get(tf_name, 0) + 1
+        print(
+            f"[{tf_name}] ⚠️  Cycle overrun: {elapsed:.2f}s > {interval:.2f}s "
+            f"({self.cycle_overruns[tf_name]} total)"
+        )
+    
+    async def _process_timeframe(
+        self,
+        tf_name: str,
+        tf_config: TimeframeConfig,
+        deadline: Optional[float] = None
+    ):
+        """
+        Process a single timeframe
+        
+        No new orders are started once `deadline` (time.monotonic()) passes;
+        in-flight placements always complete so no leg is left untracked.
+        """
         try:
             scheduler = self.schedulers[tf_name]
             tracker = self.position_trackers[tf_name]
@@ -164,8 +262,10 @@ class DualTimeframeBot:
             # 2. Check for resolved positions and redeem
             await self._redeem_resolved(tf_name, tracker)
             
-            # 3. Update position tracking
-            await tracker.update_positions(self.client)
+            # 3. Update position tracking (the user feed pushes fills and
+            #    reconciles on its own while connected)
+            if not (self.user_feed and self.user_feed.connected):
+                await tracker.update_positions(self.client)
             
             # 4. Risk check - can we place more orders?
             current_positions = len(tracker.open_positions)
@@ -174,23 +274,47 @@ class DualTimeframeBot:
             
             # 5. Find markets needing orders
             for market in markets:
+                if deadline is not None and time.monotonic() > deadline:
+                    print(f"[{tf_name}] Cycle deadline reached - deferring remaining markets")
+                    break
+                
                 if tracker.has_position(market['condition_id']):
                     continue
+                
+                if self.liquidity:
+                    await self._watch_liquidity(market, tf_config, engine)
                     
                 # Check risk limits
                 if not risk.can_place_order(market):
                     continue
                 
-                # Place dual-side orders
-                orders_placed = await engine.place_dual_orders(market)
+                # Track the position before posting so fills pushed by the
+                # user feed while the orders are in flight find it
+                tracker.record_order_placement(market)
+                if self.user_feed:
+                    await self.user_feed.watch([market['condition_id']])
                 
-                if orders_placed:
-                    tracker.record_order_placement(market)
+                # Place dual-side orders; keep the position while any leg
+                # rests so its fills are still tracked and redeemed
+                orders = await engine.place_dual_orders(market)
+                
+                if orders and all(orders):
                     print(f"[{tf_name}] Placed orders on {market['description']}")
+                elif any(orders):
+                    print(f"[{tf_name}] ⚠️  Only one leg placed on {market['description']}")
+                else:
+                    tracker.discard_position(market['condition_id'])
                     
         except Exception as e:
             print(f"[{tf_name}] Error: {e}")
     
+    async def _watch_liquidity(self, market: dict, tf_config: TimeframeConfig, engine: OrderEngine):
+        """Start tracking book depth and trade flow for a candidate market"""
+        order_size = micros_to_float(engine.order_size_micros(market))
+        new_tokens = self.liquidity.watch(market, tf_config.buy_price, order_size)
+        if new_tokens:
+            await self.book_feed.subscribe_many(new_tokens)
+    
     async def _redeem_resolved(self, tf_name: str, tracker: PositionTracker):
         """Redeem resolved positions for a timeframe"""
         try:
@@ -3,5 +3,14 @@ from src.api.gamma import GammaAPI
 from src.api.clob import ClobAPI
 from src.api.data_api import DataAPI
 from src.api.polygonscan import PolygonScanAPI
+from src.api.transport import HttpTransport, get_transport, close_transport
 
-__all__ = ['GammaAPI', 'ClobAPI', 'DataAPI', 'PolygonScanAPI']
+__all__ = [
+    'GammaAPI',
+    'ClobAPI',
+    'DataAPI',
+    'PolygonScanAPI',
+    'HttpTransport',
+    'get_transport',
+    'close_transport'
+]
@@ -2,39 +2,44 @@
 """
 Polymarket CLOB API client
 """
-import httpx
 from typing import List, Dict, Optional
 from decimal import Decimal
 
+from src.api.codec import response_json
+from src.api.transport import HttpTransport, get_transport
 from src.config import Config
 
 
 class ClobAPI:
     """Client for Polymarket CLOB API"""
     
-    def __init__(self):
+    def __init__(self, transport: Optional[HttpTransport] = None, recorder=None):
         self.endpoint = Config.CLOB_API_ENDPOINT
+        self.transport = transport or get_transport()
+        self.recorder = recorder  # MarketDataRecorder tees responses to disk
     
     async def get_order_book(self, token_id: str) -> Optional[Dict]:
         """Get order book for a token"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.endpoint}/book",
-                params={'token_id': token_id},
-                timeout=30.0
-            )
-            if response.status_code == 200:
-                return response.json()
-            return None
+        response = await self.transport.get(
+            f"{self.endpoint}/book",
+            params={'token_id': token_id}
+        )
+        if response.status_code == 200:
+            book = response_json(response)
+            if self.recorder:
+                self.recorder.record('rest.book', {'token_id': token_id, 'book': book})
+            return book
+        return None
     
     async def get_market_trades(self, condition_id: str) -> List[Dict]:
         """Get recent trades for a market"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.endpoint}/trades",
-                params={'condition_id': condition_id},
-                timeout=30.0
-            )
-            if response.status_code == 200:
-                return response.json().get('trades', [])
-            return []
+        response = await self.transport.get(
+            f"{self.endpoint}/trades",
+            params={'condition_id': condition_id}
+        )
+        if response.status_code == 200:
+            trades = response_json(response).get('trades', [])
+            if self.recorder:
+                self.recorder.record('rest.trades', {'condition_id': condition_id, 'trades': trades})
+            return trades
+        return []
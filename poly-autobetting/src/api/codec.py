@@ -0,0 +1,41 @@
+# JSON Codec
+"""
+Pluggable JSON decoding - uses orjson or ujson when installed
+"""
+import json
+from typing import Union
+
+try:
+    import orjson as _fast_json
+    JSON_BACKEND = 'orjson'
+except ImportError:
+    try:
+        import ujson as _fast_json
+        JSON_BACKEND = 'ujson'
+    except ImportError:
+        _fast_json = None
+        JSON_BACKEND = 'json'
+
+
+TICKS_PER_UNIT = 10_000  # 0.0001 price resolution covers every Polymarket tick size (0.1 down to 0.0001)
+
+
+def loads(data: Union[bytes, str]):
+    """Decode JSON with the fastest available backend"""
+    if _fast_json is not None:
+        return _fast_json.loads(data)
+    return json.loads(data)
+
+
+def dumps(obj) -> str:
+    """Encode JSON with the fastest available backend"""
+    if JSON_BACKEND == 'orjson':
+        return _fast_json.dumps(obj).decode()
+    if _fast_json is not None:
+        return _fast_json.dumps(obj)
+    return json.dumps(obj)
+
+
+def response_json(response):
+    """Decode an httpx response body with the fast backend"""
+    return loads(response.content)
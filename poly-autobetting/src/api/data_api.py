@@ -2,15 +2,18 @@
 """
 Polymarket Data API client for historical data
 """
-import httpx
 from typing import List, Dict, Optional
 
+from src.api.codec import response_json
+from src.api.transport import HttpTransport, get_transport
+
 
 class DataAPI:
     """Client for Polymarket Data API"""
     
-    def __init__(self):
+    def __init__(self, transport: Optional[HttpTransport] = None):
         self.endpoint = "https://api.polymarket.com"
+        self.transport = transport or get_transport()
     
     async def get_historical_prices(
         self,
@@ -25,12 +28,10 @@ class DataAPI:
         if end_time:
             params['end_time'] = end_time
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.endpoint}/prices",
-                params=params,
-                timeout=30.0
-            )
-            if response.status_code == 200:
-                return response.json()
-            return []
+        response = await self.transport.get(
+            f"{self.endpoint}/prices",
+            params=params
+        )
+        if response.status_code == 200:
+            return response_json(response)
+        return []
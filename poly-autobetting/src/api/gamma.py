@@ -2,48 +2,167 @@
 """
 Polymarket Gamma API client for market discovery
 """
-import httpx
+import asyncio
+import json
+from datetime import datetime
 from typing import List, Dict, Optional
 
+from src.api.codec import response_json
+from src.api.transport import HttpTransport, get_transport
 from src.config import Config
 
 
+def parse_iso_ts(value: Optional[str]) -> Optional[float]:
+    """Parse an ISO-8601 timestamp (with optional 'Z') to epoch seconds"""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except (TypeError, ValueError):
+        return None
+    if parsed.tzinfo is None:
+        # Gamma timestamps are UTC
+        return (parsed - datetime(1970, 1, 1)).total_seconds()
+    return parsed.timestamp()
+
+
+def market_winner(market: Dict) -> Optional[int]:
+    """Winning outcome index of a resolved market, None while unresolved"""
+    for i, token in enumerate(market.get('tokens') or []):
+        if token.get('winner'):
+            return i
+    
+    if not market.get('closed'):
+        return None
+    prices = market.get('outcomePrices')
+    if isinstance(prices, str):
+        try:
+            prices = json.loads(prices)
+        except ValueError:
+            return None
+    for i, price in enumerate(prices or []):
+        try:
+            if float(price) >= 0.99:
+                return i
+        except (TypeError, ValueError):
+            continue
+    return None
+
+
 class GammaAPI:
     """Client for Polymarket Gamma API"""
     
-    def __init__(self):
+    def __init__(self, transport: Optional[HttpTransport] = None):
         self.endpoint = Config.GAMMA_API_ENDPOINT
+        self.transport = transport or get_transport()
     
     async def get_markets(
         self,
-        active: bool = True,
-        archived: bool = False,
-        closed: bool = False,
-        limit: int = 100
+        active: Optional[bool] = True,
+        archived: Optional[bool] = False,
+        closed: Optional[bool] = False,
+        limit: int = 100,
+        offset: int = 0,
+        order: Optional[str] = None,
+        ascending: Optional[bool] = None
     ) -> List[Dict]:
-        """Fetch markets from Gamma API"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.endpoint}/markets",
-                params={
-                    'active': str(active).lower(),
-                    'archived': str(archived).lower(),
-                    'closed': str(closed).lower(),
-                    'limit': limit
-                },
-                timeout=30.0
+        """Fetch one page of markets from Gamma API (None skips a filter)"""
+        params = {'limit': limit, 'offset': offset}
+        for name, value in (
+            ('active', active),
+            ('archived', archived),
+            ('closed', closed),
+            ('ascending', ascending)
+        ):
+            if value is not None:
+                params[name] = str(value).lower()
+        if order:
+            params['order'] = order
+        
+        response = await self.transport.get(
+            f"{self.endpoint}/markets",
+            params=params
+        )
+        response.raise_for_status()
+        data = response_json(response)
+        # Handle both formats: {data: [...]} and direct list
+        if isinstance(data, list):
+            return data
+        return data.get('data', []) if isinstance(data, dict) else []
+    
+    async def get_all_markets(
+        self,
+        page_size: int = 100,
+        concurrency: int = 4,
+        **filters
+    ) -> List[Dict]:
+        """
+        Fetch every page of markets, `concurrency` pages at a time
+        
+        Stops at the first short page; duplicates across pages are dropped.
+        """
+        markets: List[Dict] = []
+        seen = set()
+        offset = 0
+        
+        while True:
+            pages = await asyncio.gather(*[
+                self.get_markets(limit=page_size, offset=offset + i * page_size, **filters)
+                for i in range(concurrency)
+            ])
+            offset += concurrency * page_size
+            
+            for page in pages:
+                for market in page:
+                    key = market.get('condition_id') or market.get('conditionId') or id(market)
+                    if key not in seen:
+                        seen.add(key)
+                        markets.append(market)
+            
+            if any(len(page) < page_size for page in pages):
+                return markets
+    
+    async def get_markets_updated_since(
+        self,
+        watermark: float,
+        page_size: int = 100,
+        max_pages: int = 20
+    ) -> Optional[List[Dict]]:
+        """
+        Fetch markets created or changed after `watermark` (epoch seconds)
+        
+        Walks pages newest-updated first and stops at the first market at or
+        before the watermark. Includes closed/archived markets so callers
+        can drop them. Returns None if the change set exceeds `max_pages`.
+        """
+        changed: List[Dict] = []
+        
+        for page_num in range(max_pages):
+            page = await self.get_markets(
+                active=None,
+                archived=None,
+                closed=None,
+                limit=page_size,
+                offset=page_num * page_size,
+                order='updatedAt',
+                ascending=False
             )
-            response.raise_for_status()
-            data = response.json()
-            return data.get('data', [])
+            for market in page:
+                updated = parse_iso_ts(market.get('updatedAt') or market.get('updated_at'))
+                if updated is not None and updated <= watermark:
+                    return changed
+                changed.append(market)
+            
+            if len(page) < page_size:
+                return changed
+        
+        return None
     
     async def get_market(self, condition_id: str) -> Optional[Dict]:
         """Get a specific market by condition ID"""
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                f"{self.endpoint}/markets/{condition_id}",
-                timeout=30.0
-            )
-            if response.status_code == 200:
-                return response.json()
-            return None
+        response = await self.transport.get(
+            f"{self.endpoint}/markets/{condition_id}"
+        )
+        if response.status_code == 200:
+            return response_json(response)
+        return None
@@ -3,16 +3,19 @@
 Polygon chain queries via PolygonScan API
 """
 import os
-import httpx
 from typing import Optional, Dict
 
+from src.api.codec import response_json
+from src.api.transport import HttpTransport, get_transport
+
 
 class PolygonScanAPI:
     """Client for PolygonScan API"""
     
-    def __init__(self):
+    def __init__(self, transport: Optional[HttpTransport] = None):
         self.api_key = os.getenv('POLYGONSCAN_API_KEY', '')
         self.endpoint = "https://api.polygonscan.com/api"
+        self.transport = transport or get_transport()
     
     async def get_token_balance(
         self,
@@ -23,24 +26,22 @@ class PolygonScanAPI:
         if not self.api_key:
             return None
         
-        async with httpx.AsyncClient() as client:
-            response = await client.get(
-                self.endpoint,
-                params={
-                    'module': 'account',
-                    'action': 'tokenbalance',
-                    'contractaddress': contract_address,
-                    'address': wallet_address,
-                    'tag': 'latest',
-                    'apikey': self.api_key
-                },
-                timeout=30.0
-            )
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == '1':
-                    return int(data['result'])
-            return None
+        response = await self.transport.get(
+            self.endpoint,
+            params={
+                'module': 'account',
+                'action': 'tokenbalance',
+                'contractaddress': contract_address,
+                'address': wallet_address,
+                'tag': 'latest',
+                'apikey': self.api_key
+            }
+        )
+        if response.status_code == 200:
+            data = response_json(response)
+            if data.get('status') == '1':
+                return int(data['result'])
+        return None
     
     async def get_usdc_balance(self, wallet_address: str) -> Optional[float]:
         """Get USDC balance for a wallet"""
@@ -0,0 +1,97 @@
+# HTTP Transport
+"""
+Shared pooled async HTTP transport for all API clients
+"""
+from typing import Dict, Optional
+from urllib.parse import urlsplit
+import httpx
+
+from src.config import Config
+
+
+def _http2_available() -> bool:
+    """HTTP/2 needs the optional `h2` package"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class HttpTransport:
+    """
+    Process-wide pool of keep-alive `httpx.AsyncClient`s, one per host.
+
+    Each host gets its own client so connection limits apply per host and
+    a slow endpoint cannot starve the connection pool of the others.
+    """
+
+    def __init__(
+        self,
+        timeout: float = Config.HTTP_TIMEOUT,
+        connect_timeout: float = Config.HTTP_CONNECT_TIMEOUT,
+        max_connections_per_host: int = Config.HTTP_MAX_CONNECTIONS_PER_HOST,
+        max_keepalive_per_host: int = Config.HTTP_MAX_KEEPALIVE_PER_HOST,
+        keepalive_expiry: float = Config.HTTP_KEEPALIVE_EXPIRY,
+        http2: bool = Config.HTTP2_ENABLED
+    ):
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections_per_host,
+            max_keepalive_connections=max_keepalive_per_host,
+            keepalive_expiry=keepalive_expiry
+        )
+        self.http2 = http2 and _http2_available()
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def client_for(self, url: str) -> httpx.AsyncClient:
+        """Get the pooled client for the host of `url`"""
+        key = self._host_key(url)
+        client = self._clients.get(key)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(
+                timeout=self.timeout,
+                limits=self.limits,
+                http2=self.http2
+            )
+            self._clients[key] = client
+        return client
+
+    async def get(self, url: str, **kwargs) -> httpx.Response:
+        """GET through the pooled client for the url's host"""
+        return await self.client_for(url).get(url, **kwargs)
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        """POST through the pooled client for the url's host"""
+        return await self.client_for(url).post(url, **kwargs)
+
+    async def aclose(self):
+        """Close all pooled connections"""
+        clients = list(self._clients.values())
+        self._clients.clear()
+        for client in clients:
+            await client.aclose()
+
+
+_transport: Optional[HttpTransport] = None
+
+
+def get_transport() -> HttpTransport:
+    """Get the process-wide transport, creating it on first use"""
+    global _transport
+    if _transport is None:
+        _transport = HttpTransport()
+    return _transport
+
+
+async def close_transport():
+    """Close the process-wide transport (call on shutdown)"""
+    global _transport
+    if _transport is not None:
+        await _transport.aclose()
+        _transport = None
@@ -1,11 +1,13 @@
 # Bot package
 from src.bot.market_scheduler import MarketScheduler
+from src.bot.market_catalog import MarketCatalog
 from src.bot.order_engine import OrderEngine
 from src.bot.position_tracker import PositionTracker
 from src.bot.risk_engine import RiskEngine
 
 __all__ = [
     'MarketScheduler',
+    'MarketCatalog',
     'OrderEngine',
     'PositionTracker',
     'RiskEngine'
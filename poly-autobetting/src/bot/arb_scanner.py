@@ -0,0 +1,239 @@
+# Arbitrage Scanner
+"""
+Depth-aware YES/NO arbitrage scanner over the local order books
+"""
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.api.codec import TICKS_PER_UNIT
+from src.bot.fixed_point import arb_profit_ticks, fee_to_bps
+from src.bot.order_book import BookSide, OrderBook, OrderBookManager
+from src.bot.token_cache import extract_token_ids, market_condition_id
+from src.config import Config
+
+
+NO_ASK = 10 * TICKS_PER_UNIT  # sentinel for an empty ask side
+
+
+@dataclass
+class ArbOpportunity:
+    """Buying both outcomes' asks for less than $1 net of taker fees"""
+    condition_id: str
+    yes_token: str
+    no_token: str
+    size: float  # shares of each outcome executable at a profit
+    edge: float  # total expected profit in USDC after fees
+    cost: float  # USDC spent on both legs before fees
+    best_edge_ticks: int  # per-share edge at the top of both books
+    worst_yes_tick: int  # limit prices that sweep the profitable depth
+    worst_no_tick: int
+    levels: int
+
+    @property
+    def edge_per_share(self) -> float:
+        return self.edge / self.size if self.size else 0.0
+
+
+class ArbScanner:
+    """
+    Keeps the best ask of every tracked market's YES and NO tokens in
+    contiguous arrays. A book update re-evaluates only its own market;
+    scan() checks all markets' top of book in one vectorized pass and only
+    walks depth where the top crosses.
+    """
+
+    def __init__(
+        self,
+        book_manager: OrderBookManager,
+        taker_fee=Config.TAKER_FEE,
+        min_edge_ticks: int = 1,
+        max_levels: int = 20
+    ):
+        """
+        Args:
+            book_manager: Source of local books
+            taker_fee: Fee rate charged on the cost of each leg
+            min_edge_ticks: Smallest per-share edge worth taking
+            max_levels: Cap on levels walked per side
+        """
+        self.book_manager = book_manager
+        self.fee_bps = fee_to_bps(taker_fee)
+        self.min_edge_ticks = min_edge_ticks
+        self.max_levels = max_levels
+        self.on_opportunity: Optional[Callable] = None  # called with each new/changed ArbOpportunity
+
+        self.condition_ids: List[str] = []
+        self.pairs: List[Tuple[str, str]] = []
+        self.slot_by_cid: Dict[str, int] = {}
+        self.slot_by_token: Dict[str, Tuple[int, int]] = {}  # token -> (slot, 0 yes / 1 no)
+        self._asks = np.full((0, 2), NO_ASK, dtype=np.int64)
+        self.opportunities: Dict[str, ArbOpportunity] = {}
+
+        book_manager.add_listener(self.on_book_update)
+
+    def track(self, markets: List[Dict]):
+        """Track binary markets (Gamma market dicts)"""
+        for market in markets:
+            tokens = extract_token_ids(market)
+            condition_id = market_condition_id(market)
+            if condition_id and len(tokens) >= 2:
+                self.add_market(condition_id, tokens[0], tokens[1])
+
+    def add_market(self, condition_id: str, yes_token: str, no_token: str):
+        if condition_id in self.slot_by_cid:
+            return
+        slot = len(self.condition_ids)
+        self.condition_ids.append(condition_id)
+        self.pairs.append((yes_token, no_token))
+        self.slot_by_cid[condition_id] = slot
+        self.slot_by_token[yes_token] = (slot, 0)
+        self.slot_by_token[no_token] = (slot, 1)
+
+        if slot >= len(self._asks):
+            grown = np.full((max(16, 2 * len(self._asks)), 2), NO_ASK, dtype=np.int64)
+            grown[:len(self._asks)] = self._asks
+            self._asks = grown
+        for side, token_id in enumerate((yes_token, no_token)):
+            book = self.book_manager.get_book(token_id)
+            best = book.asks.best() if book else None
+            self._asks[slot, side] = best if best is not None else NO_ASK
+
+    def remove_market(self, condition_id: str):
+        """Stop tracking a market (its slot is compacted away)"""
+        slot = self.slot_by_cid.pop(condition_id, None)
+        if slot is None:
+            return
+        self.opportunities.pop(condition_id, None)
+        last = len(self.condition_ids) - 1
+
+        # Move the last market into the freed slot
+        for token_id in self.pairs[slot]:
+            self.slot_by_token.pop(token_id, None)
+        if slot != last:
+            moved_cid = self.condition_ids[last]
+            self.condition_ids[slot] = moved_cid
+            self.pairs[slot] = self.pairs[last]
+            self._asks[slot] = self._asks[last]
+            self.slot_by_cid[moved_cid] = slot
+            self.slot_by_token[self.pairs[slot][0]] = (slot, 0)
+            self.slot_by_token[self.pairs[slot][1]] = (slot, 1)
+        self.condition_ids.pop()
+        self.pairs.pop()
+        self._asks[last] = NO_ASK
+
+    def on_book_update(self, token_id: str, book: OrderBook):
+        """OrderBookManager listener: refresh one market"""
+        located = self.slot_by_token.get(token_id)
+        if located is None:
+            return
+        slot, side = located
+        best = book.asks.best() if book.valid else None
+        self._asks[slot, side] = best if best is not None else NO_ASK
+        self._evaluate(slot)
+
+    def scan(self) -> List[ArbOpportunity]:
+        """Re-evaluate every market; returns ranked opportunities"""
+        n = len(self.condition_ids)
+        asks = self._asks[:n]
+        profit = arb_profit_ticks(asks[:, 0], asks[:, 1], self.fee_bps)
+        crossing = np.flatnonzero(profit >= self.min_edge_ticks)
+
+        self.opportunities = {}
+        for slot in crossing:
+            self._evaluate(int(slot), notify=False)
+        return self.ranked()
+
+    def ranked(self, limit: Optional[int] = None) -> List[ArbOpportunity]:
+        """Current opportunities, largest expected edge first"""
+        ranked = sorted(self.opportunities.values(), key=lambda o: o.edge, reverse=True)
+        return ranked[:limit] if limit else ranked
+
+    def _evaluate(self, slot: int, notify: bool = True):
+        condition_id = self.condition_ids[slot]
+        yes_ask, no_ask = self._asks[slot]
+        if arb_profit_ticks(int(yes_ask), int(no_ask), self.fee_bps) < self.min_edge_ticks:
+            self.opportunities.pop(condition_id, None)
+            return
+
+        yes_token, no_token = self.pairs[slot]
+        yes_book = self.book_manager.get_book(yes_token)
+        no_book = self.book_manager.get_book(no_token)
+        if yes_book is None or no_book is None:
+            self.opportunities.pop(condition_id, None)
+            return
+
+        opportunity = self._walk(condition_id, yes_token, no_token, yes_book.asks, no_book.asks)
+        if opportunity is None:
+            self.opportunities.pop(condition_id, None)
+            return
+
+        previous = self.opportunities.get(condition_id)
+        self.opportunities[condition_id] = opportunity
+        if notify and self.on_opportunity and (
+            previous is None or previous.size != opportunity.size or previous.edge != opportunity.edge
+        ):
+            self.on_opportunity(opportunity)
+
+    def _walk(
+        self,
+        condition_id: str,
+        yes_token: str,
+        no_token: str,
+        yes: BookSide,
+        no: BookSide
+    ) -> Optional[ArbOpportunity]:
+        """Match both ask ladders level by level while the pair stays profitable"""
+        yes_ticks, no_ticks = yes.ticks, no.ticks
+        if not yes_ticks or not no_ticks:
+            return None
+        i = j = 0
+        yes_left = yes.levels[yes_ticks[0]]
+        no_left = no.levels[no_ticks[0]]
+        size = edge = cost = 0.0
+        best_edge = worst_yes = worst_no = None
+        levels = 0
+
+        while levels < self.max_levels:
+            yes_tick, no_tick = yes_ticks[i], no_ticks[j]
+            per_share = arb_profit_ticks(yes_tick, no_tick, self.fee_bps)
+            if per_share < self.min_edge_ticks:
+                break
+            if best_edge is None:
+                best_edge = per_share
+
+            worst_yes, worst_no = yes_tick, no_tick
+            take = min(yes_left, no_left)
+            size += take
+            edge += take * per_share
+            cost += take * (yes_tick + no_tick)
+            yes_left -= take
+            no_left -= take
+            levels += 1
+
+            if yes_left <= 0:
+                i += 1
+                if i == len(yes_ticks):
+                    break
+                yes_left = yes.levels[yes_ticks[i]]
+            if no_left <= 0:
+                j += 1
+                if j == len(no_ticks):
+                    break
+                no_left = no.levels[no_ticks[j]]
+
+        if not size:
+            return None
+        return ArbOpportunity(
+            condition_id=condition_id,
+            yes_token=yes_token,
+            no_token=no_token,
+            size=size,
+            edge=edge / TICKS_PER_UNIT,
+            cost=cost / TICKS_PER_UNIT,
+            best_edge_ticks=best_edge,
+            worst_yes_tick=worst_yes,
+            worst_no_tick=worst_no,
+            levels=levels
+        )
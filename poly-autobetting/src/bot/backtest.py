@@ -2,8 +2,9 @@
 """
 Backtesting utilities
 """
+import math
 from decimal import Decimal
-from typing import List, Dict
+from typing import List, Dict, Optional, Sequence
 from dataclasses import dataclass
 
 
@@ -16,6 +17,18 @@ class BacktestResult:
     total_profit: Decimal
     max_drawdown: Decimal
     sharpe_ratio: Decimal
+    one_sided_fills: int = 0
+    unfilled_markets: int = 0
+    skipped_markets: int = 0  # markets opened but never bid on
+
+
+def sharpe_ratio(returns: Sequence[float]) -> float:
+    """Per-trade Sharpe ratio (mean / sample stdev of returns)"""
+    if len(returns) < 2:
+        return 0.0
+    mean = sum(returns) / len(returns)
+    var = sum((r - mean) ** 2 for r in returns) / (len(returns) - 1)
+    return mean / math.sqrt(var) if var > 0 else 0.0
 
 
 class Backtester:
@@ -32,6 +45,9 @@ class Backtester:
         """
         Run backtest on historical data
         
+        Records may carry 'up_filled' / 'down_filled' (bool) and 'winner'
+        (0 = UP, 1 = DOWN); without them both sides are assumed filled.
+        
         Args:
             historical_data: List of market outcomes
             initial_capital: Starting capital
@@ -45,15 +61,32 @@ class Backtester:
         
         wins = 0
         losses = 0
+        one_sided = 0
+        unfilled = 0
+        returns = []
         
         for market in historical_data:
-            # Simulate buying both sides at buy_price
-            cost = self.buy_price * 2
+            up_filled = market.get('up_filled', True)
+            down_filled = market.get('down_filled', True)
+            if not (up_filled or down_filled):
+                unfilled += 1
+                continue
+            if not (up_filled and down_filled):
+                one_sided += 1
             
-            # Always win $1 (one side pays out)
-            payout = Decimal('1.0')
+            cost = self.buy_price * (int(up_filled) + int(down_filled))
+            
+            # $1 if we hold the winning side
+            winner = market.get('winner')
+            if up_filled and down_filled:
+                payout = Decimal('1.0')
+            elif winner is None:
+                payout = Decimal('0')
+            else:
+                payout = Decimal('1.0') if (winner == 0) == up_filled else Decimal('0')
             profit = payout - cost
             
+            returns.append(float(profit / capital) if capital > 0 else 0.0)
             capital += profit
             
             if profit > 0:
@@ -77,5 +110,51 @@ class Backtester:
             losing_trades=losses,
             total_profit=total_profit,
             max_drawdown=max_drawdown,
-            sharpe_ratio=Decimal('0')  # Would calculate properly with returns series
+            sharpe_ratio=Decimal(str(round(sharpe_ratio(returns), 6))),
+            one_sided_fills=one_sided,
+            unfilled_markets=unfilled
+        )
+    
+    def run_events(
+        self,
+        events: List[Dict],
+        initial_capital: Decimal = Decimal('1000'),
+        max_positions: int = 10
+    ) -> BacktestResult:
+        """
+        Replay book/trade events through the order-book simulator
+        
+        See src.bot.simulator.EventBacktester for the event format.
+        """
+        from src.bot.simulator import EventBacktester
+        
+        backtester = EventBacktester(
+            buy_price=self.buy_price,
+            max_positions=max_positions,
+            initial_capital=initial_capital
         )
+        return backtester.run(events)
+    
+    def run_sweep(
+        self,
+        data,
+        entry_prices: Optional[Sequence[float]] = None,
+        stop_losses: Sequence[Optional[float]] = (None,),
+        sizes: Sequence[float] = (1.0,),
+        initial_capital: float = 1000.0
+    ):
+        """
+        Vectorized sweep over entry price x stop-loss x size
+        
+        Args:
+            data: MarketArrays (see src.bot.vector_backtest)
+            entry_prices: Candidate buy prices (default: this backtester's)
+        
+        Returns:
+            SweepResult
+        """
+        from src.bot.vector_backtest import run_sweep
+        
+        if entry_prices is None:
+            entry_prices = [float(self.buy_price)]
+        return run_sweep(data, entry_prices, stop_losses, sizes, initial_capital)
@@ -6,23 +6,26 @@ from decimal import Decimal
 import os
 import asyncio
 from py_clob_client.client import ClobClient
-from py_clob_client.clob_types import ApiCreds, OrderArgs, OrderType
+from py_clob_client.clob_types import ApiCreds, OrderArgs, OrderType, PostOrdersArgs, TradeParams
 from py_clob_client.order_builder.constants import BUY, SELL
 from src.bot.types import OrderSide as BotOrderSide, OrderType as BotOrderType
+from src.bot.token_cache import TokenCache
 
 
 class ClobClientWrapper:
     """Wrapper for Polymarket CLOB client - real trading implementation"""
     
-    def __init__(self, config):
+    def __init__(self, config, token_cache: Optional[TokenCache] = None):
         self.config = config
         self.client: Optional[ClobClient] = None
+        self.token_cache = token_cache or TokenCache()
         self.api_key = os.getenv('POLYMARKET_BUILDER_API_KEY')
         self.api_secret = os.getenv('POLYMARKET_BUILDER_SECRET')
         self.passphrase = os.getenv('POLYMARKET_BUILDER_PASSPHRASE')
         self.private_key = os.getenv('POLYMARKET_PRIVATE_KEY')
         self.chain_id = int(os.getenv('CHAIN_ID', '137'))
         self.clob_endpoint = os.getenv('CLOB_API_ENDPOINT', 'https://clob.polymarket.com')
+        self.address: Optional[str] = None
         
     def initialize(self):
         """Initialize the CLOB client with credentials"""
@@ -49,6 +52,7 @@ class ClobClientWrapper:
         # Set API credentials
         if creds:
             self.client.set_api_creds(creds)
+        self.address = self.client.get_address()
         
         print(f"✅ CLOB client initialized (chain: {self.chain_id})")
         return self
@@ -63,6 +67,75 @@ class ClobClientWrapper:
         size: Decimal
     ) -> Optional[Dict]:
         """Place an order on the CLOB"""
+        signed_order = await self.sign_order(condition_id, outcome_index, side, price, size)
+        if signed_order is None:
+            return None
+        
+        try:
+            loop = asyncio.get_event_loop()
+            response = await loop.run_in_executor(
+                None,
+                lambda: self.client.post_order(signed_order, OrderType.GTC)
+            )
+            
+            print(f"✅ Order placed: {response.get('orderID', 'unknown')}")
+            return self._format_order_response(response)
+            
+        except Exception as e:
+            print(f"❌ Order placement failed: {e}")
+            return None
+    
+    async def place_orders(self, legs: List[Dict]) -> List[Optional[Dict]]:
+        """
+        Sign several orders concurrently and post them in one batch request
+        
+        Args:
+            legs: Dicts with condition_id, outcome_index, side, price, size
+        
+        Returns one result (or None) per leg, in order
+        """
+        signed_orders = await asyncio.gather(*[
+            self.sign_order(
+                leg['condition_id'], leg['outcome_index'], leg['side'], leg['price'], leg['size']
+            )
+            for leg in legs
+        ])
+        
+        results: List[Optional[Dict]] = [None] * len(legs)
+        batch = [(i, order) for i, order in enumerate(signed_orders) if order is not None]
+        if not batch:
+            return results
+        
+        try:
+            loop = asyncio.get_event_loop()
+            responses = await loop.run_in_executor(
+                None,
+                lambda: self.client.post_orders([
+                    PostOrdersArgs(order=order, orderType=OrderType.GTC) for _, order in batch
+                ])
+            )
+        except Exception as e:
+            print(f"❌ Batch order placement failed: {e}")
+            return results
+        
+        for (i, _), response in zip(batch, responses or []):
+            if response and response.get('success', True) and response.get('orderID'):
+                print(f"✅ Order placed: {response.get('orderID')}")
+                results[i] = self._format_order_response(response)
+            else:
+                print(f"❌ Order rejected: {response}")
+        
+        return results
+    
+    async def sign_order(
+        self,
+        condition_id: str,
+        outcome_index: int,
+        side: str,
+        price: Decimal,
+        size: Decimal
+    ):
+        """Resolve the outcome token and sign an order (post separately)"""
         if not self.client:
             raise RuntimeError("Client not initialized. Call initialize() first.")
         
@@ -73,46 +146,39 @@ class ClobClientWrapper:
             return None
         
         # Map side
+        if isinstance(side, BotOrderSide):
+            side = side.value
         side_enum = BUY if side.upper() == 'BUY' else SELL
         
-        # Map order type
-        order_type_enum = OrderType.GTC  # Good-til-cancelled
-        
         # Build order args
         order_args = OrderArgs(
             token_id=token_id,
             price=float(price),
             size=float(size),
-            side=side_enum,
-            order_type=order_type_enum
+            side=side_enum
         )
         
         try:
-            # Create and post order (sync call in thread)
+            # Signing is sync in the SDK - run in thread
             loop = asyncio.get_event_loop()
-            signed_order = await loop.run_in_executor(
-                None, 
-                lambda: self.client.create_order(order_args)
-            )
-            
-            response = await loop.run_in_executor(
+            return await loop.run_in_executor(
                 None,
-                lambda: self.client.post_order(signed_order)
+                lambda: self.client.create_order(order_args)
             )
-            
-            print(f"✅ Order placed: {response.get('orderID', 'unknown')}")
-            return {
-                'order_id': response.get('orderID'),
-                'status': response.get('status', 'pending'),
-                'taking_amount': response.get('takingAmount'),
-                'making_amount': response.get('makingAmount'),
-                'raw_response': response
-            }
-            
         except Exception as e:
-            print(f"❌ Order placement failed: {e}")
+            print(f"❌ Order signing failed: {e}")
             return None
     
+    @staticmethod
+    def _format_order_response(response: Dict) -> Dict:
+        return {
+            'order_id': response.get('orderID'),
+            'status': response.get('status', 'pending'),
+            'taking_amount': response.get('takingAmount'),
+            'making_amount': response.get('makingAmount'),
+            'raw_response': response
+        }
+    
     async def cancel_all_orders(self, condition_id: str):
         """Cancel all orders for a market"""
         if not self.client:
@@ -145,20 +211,69 @@ class ClobClientWrapper:
             return []
     
     async def get_fills(self, condition_id: str) -> List[Dict]:
-        """Get fills for a market"""
+        """Get our fills for one market"""
+        return await self._get_fills(TradeParams(market=condition_id))
+    
+    async def get_trades_since(self, after: Optional[int] = None) -> List[Dict]:
+        """Get our fills across all markets matched after `after` (unix seconds)"""
+        return await self._get_fills(TradeParams(after=after) if after else None)
+    
+    async def _get_fills(self, params: Optional[TradeParams]) -> List[Dict]:
         if not self.client:
             return []
         
         try:
             loop = asyncio.get_event_loop()
-            fills = await loop.run_in_executor(
+            trades = await loop.run_in_executor(
                 None,
-                lambda: self.client.get_trades()
+                lambda: self.client.get_trades(params)
             )
-            return fills.get('trades', [])
         except Exception as e:
             print(f"❌ Get fills failed: {e}")
             return []
+        
+        fills = []
+        for trade in trades:
+            fills.extend(self.normalize_trade(trade))
+        return fills
+    
+    def normalize_trade(self, trade: Dict) -> List[Dict]:
+        """
+        Turn a CLOB trade into our fills: the trade itself when we were the
+        taker, or our matched maker orders when we were the maker
+        """
+        if trade.get('trader_side') == 'MAKER':
+            legs = [
+                (f"{trade.get('id')}:{m.get('order_id')}", m.get('asset_id'), m.get('price'), m.get('matched_amount'), m.get('side'))
+                for m in trade.get('maker_orders', [])
+                if self.is_own_order(m)
+            ]
+        else:
+            legs = [(trade.get('id'), trade.get('asset_id'), trade.get('price'), trade.get('size'), trade.get('side'))]
+        
+        fills = []
+        for trade_id, asset_id, price, size, side in legs:
+            located = self.token_cache.lookup_token(asset_id) if asset_id else None
+            if located is None or price is None or size is None:
+                continue
+            condition_id, outcome_index = located
+            fills.append({
+                'trade_id': trade_id,
+                'condition_id': trade.get('market') or condition_id,
+                'outcome_index': outcome_index,
+                'price': str(price),
+                'size': str(size),
+                'side': (side or '').upper(),
+                'status': (trade.get('status') or '').upper(),
+                'match_time': int(trade.get('match_time') or 0),
+            })
+        return fills
+    
+    def is_own_order(self, maker_order: Dict) -> bool:
+        if self.api_key and maker_order.get('owner') == self.api_key:
+            return True
+        address = maker_order.get('maker_address') or ''
+        return bool(self.address) and address.lower() == self.address.lower()
     
     async def redeem_position(self, condition_id: str, outcome_index: int) -> Dict:
         """Redeem a position via gasless relayer"""
@@ -169,27 +284,30 @@ class ClobClientWrapper:
     
     async def _get_token_id(self, condition_id: str, outcome_index: int) -> Optional[str]:
         """Get token ID for a market outcome"""
-        # Fetch market data from Gamma API or CLOB
-        import httpx
+        token_id = self.token_cache.get(condition_id, outcome_index)
+        if token_id:
+            return token_id
+        
+        # Cache miss - fetch market data from Gamma API
+        from src.api.codec import response_json
+        from src.api.transport import get_transport
         from src.config import Config
         
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(
-                    f"{Config.GAMMA_API_ENDPOINT}/markets",
-                    params={'conditionId': condition_id},
-                    timeout=10.0
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                    markets = data.get('data', [])
-                    if markets:
-                        market = markets[0]
-                        tokens = market.get('tokens', [])
-                        if outcome_index < len(tokens):
-                            return tokens[outcome_index].get('token_id')
-            except Exception as e:
-                print(f"❌ Failed to get token ID: {e}")
+        try:
+            response = await get_transport().get(
+                f"{Config.GAMMA_API_ENDPOINT}/markets",
+                params={'conditionId': condition_id},
+                timeout=10.0
+            )
+            if response.status_code == 200:
+                data = response_json(response)
+                markets = data if isinstance(data, list) else data.get('data', [])
+                if markets:
+                    self.token_cache.put_market(markets[0])
+                    self.token_cache.save()
+                    return self.token_cache.get(condition_id, outcome_index)
+        except Exception as e:
+            print(f"❌ Failed to get token ID: {e}")
         
         return None
     
@@ -0,0 +1,194 @@
+# Feed Manager
+"""
+Shards book subscriptions across several WebSocket connections
+"""
+from typing import Callable, Dict, Iterable, List, Optional
+
+from src.bot.ws_book_feed import (
+    FeedSubscription,
+    OVERFLOW_DROP_OLDEST,
+    WebSocketBookFeed,
+)
+
+
+class ShardedBookFeed:
+    """
+    Drop-in for WebSocketBookFeed that spreads tokens over up to
+    `max_shards` connections, so one socket is neither a throughput
+    bottleneck nor a single point of failure.
+    """
+
+    def __init__(
+        self,
+        endpoint: str = "wss://clob.polymarket.com/ws",
+        tokens_per_shard: int = 100,
+        max_shards: int = 8,
+        rebalance_threshold: int = 20
+    ):
+        """
+        Args:
+            endpoint: WebSocket endpoint for every shard
+            tokens_per_shard: Open a new shard before exceeding this
+            max_shards: Hard cap on connections
+            rebalance_threshold: Rebalance when shard sizes differ by more
+        """
+        self.endpoint = endpoint
+        self.tokens_per_shard = tokens_per_shard
+        self.max_shards = max_shards
+        self.rebalance_threshold = rebalance_threshold
+
+        self.shards: List[WebSocketBookFeed] = []
+        self.assignments: Dict[str, WebSocketBookFeed] = {}  # token_id -> shard
+        self.running = False
+        self._on_message: Optional[Callable] = None
+        self._recorder = None
+        self._consumers: List[FeedSubscription] = []
+
+    @property
+    def subscriptions(self) -> set:
+        return set(self.assignments)
+
+    @property
+    def on_message(self) -> Optional[Callable]:
+        return self._on_message
+
+    @on_message.setter
+    def on_message(self, callback: Optional[Callable]):
+        self._on_message = callback
+        for shard in self.shards:
+            shard.on_message = callback
+
+    @property
+    def recorder(self):
+        return self._recorder
+
+    @recorder.setter
+    def recorder(self, recorder):
+        """MarketDataRecorder for every shard's raw frames"""
+        self._recorder = recorder
+        for shard in self.shards:
+            shard.recorder = recorder
+
+    def add_consumer(
+        self,
+        token_id: Optional[str] = None,
+        channel: Optional[str] = None,
+        maxsize: int = 1000,
+        overflow: str = OVERFLOW_DROP_OLDEST
+    ) -> FeedSubscription:
+        """Register a consumer that receives messages from every shard"""
+        consumer = FeedSubscription(token_id, channel, maxsize, overflow)
+        self._consumers.append(consumer)
+        for shard in self.shards:
+            self._attach_consumer(shard, consumer)
+        return consumer
+
+    def remove_consumer(self, consumer: FeedSubscription):
+        if consumer in self._consumers:
+            self._consumers.remove(consumer)
+        for shard in self.shards:
+            shard.remove_consumer(consumer)
+
+    @staticmethod
+    def _attach_consumer(shard: WebSocketBookFeed, consumer: FeedSubscription):
+        shard.consumers.setdefault((consumer.channel, consumer.token_id), []).append(consumer)
+
+    def _new_shard(self) -> WebSocketBookFeed:
+        shard = WebSocketBookFeed(self.endpoint, name=f"WebSocket[{len(self.shards)}]")
+        shard.on_message = self._on_message
+        shard.recorder = self._recorder
+        for consumer in self._consumers:
+            self._attach_consumer(shard, consumer)
+        self.shards.append(shard)
+        if self.running:
+            shard.start()
+        return shard
+
+    def _pick_shard(self) -> WebSocketBookFeed:
+        """Least-loaded shard, opening a new one while under the cap"""
+        if self.shards:
+            shard = min(self.shards, key=lambda s: len(s.subscriptions))
+            if len(shard.subscriptions) < self.tokens_per_shard or len(self.shards) >= self.max_shards:
+                return shard
+        return self._new_shard()
+
+    async def subscribe(self, token_id: str):
+        await self.subscribe_many([token_id])
+
+    async def subscribe_many(self, token_ids: Iterable[str]):
+        """Assign new tokens to shards and subscribe them in batches"""
+        batches: Dict[int, List[str]] = {}
+        for token_id in token_ids:
+            if token_id in self.assignments:
+                continue
+            shard = self._pick_shard()
+            self.assignments[token_id] = shard
+            # Reserve the slot so the next pick sees the load
+            shard.subscriptions.add(token_id)
+            batches.setdefault(id(shard), []).append(token_id)
+
+        for shard in self.shards:
+            tokens = batches.get(id(shard))
+            if tokens:
+                shard.subscriptions.difference_update(tokens)
+                await shard.subscribe_many(tokens)
+
+    async def unsubscribe(self, token_id: str):
+        shard = self.assignments.pop(token_id, None)
+        if shard is not None:
+            await shard.unsubscribe(token_id)
+
+    async def sync(self, token_ids: Iterable[str]):
+        """Track exactly `token_ids` as markets rotate in and out"""
+        wanted = set(token_ids)
+        for token_id in [t for t in self.assignments if t not in wanted]:
+            await self.unsubscribe(token_id)
+        await self.subscribe_many(t for t in wanted if t not in self.assignments)
+        await self.rebalance()
+
+    async def rebalance(self):
+        """Move tokens from the fullest to the emptiest shard until even"""
+        if len(self.shards) < 2:
+            return
+
+        sizes = [len(s.subscriptions) for s in self.shards]
+        if max(sizes) - min(sizes) <= self.rebalance_threshold:
+            return
+
+        while True:
+            heavy = max(self.shards, key=lambda s: len(s.subscriptions))
+            light = min(self.shards, key=lambda s: len(s.subscriptions))
+            excess = (len(heavy.subscriptions) - len(light.subscriptions)) // 2
+            if excess < 1:
+                break
+
+            moving = list(heavy.subscriptions)[:excess]
+            for token_id in moving:
+                await heavy.unsubscribe(token_id)
+                self.assignments[token_id] = light
+            await light.subscribe_many(moving)
+
+        print(f"Rebalanced feed shards: {[len(s.subscriptions) for s in self.shards]}")
+
+    def start(self):
+        """Start every shard"""
+        self.running = True
+        for shard in self.shards:
+            if not shard.running:
+                shard.start()
+
+    def stop(self):
+        """Stop every shard"""
+        self.running = False
+        for shard in self.shards:
+            shard.stop()
+        for consumer in self._consumers:
+            consumer.close()
+
+    def stats(self) -> Dict:
+        return {
+            'shards': len(self.shards),
+            'tokens': len(self.assignments),
+            'per_shard': [len(s.subscriptions) for s in self.shards],
+            'reconnects': sum(s.reconnects for s in self.shards),
+        }
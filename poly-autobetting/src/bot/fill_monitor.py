@@ -2,48 +2,92 @@
 """
 Monitors order fills
 """
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import Dict, Callable, Optional
 from decimal import Decimal
 
 
+@dataclass
+class FillAggregate:
+    """Running totals for one market's retained fills"""
+    count: int = 0
+    total_size: Decimal = Decimal('0')
+    total_cost: Decimal = Decimal('0')
+
+
 class FillMonitor:
     """Monitors and reports order fills"""
-    
-    def __init__(self):
+
+    def __init__(self, max_fills: int = 1000):
+        """
+        Args:
+            max_fills: Fills retained for dedup and summaries (oldest evicted first)
+        """
         self.on_fill: Optional[Callable] = None
-        self.recent_fills: Dict[str, Dict] = {}
-    
+        self.max_fills = max_fills
+        # fill id -> (fill_data, condition_id, size, cost), insertion ordered
+        self.recent_fills: OrderedDict = OrderedDict()
+        self.by_condition: Dict[str, FillAggregate] = {}
+
     def process_fill(self, fill_data: Dict):
         """Process a fill event"""
         order_id = fill_data.get('order_id')
-        
+
         # Avoid duplicates
         if order_id in self.recent_fills:
             return
-        
-        self.recent_fills[order_id] = fill_data
-        
+
+        condition_id = fill_data.get('condition_id')
+        size = Decimal(str(fill_data.get('size', 0)))
+        cost = Decimal(str(fill_data.get('price', 0))) * size
+        self.recent_fills[order_id] = (fill_data, condition_id, size, cost)
+
+        aggregate = self.by_condition.get(condition_id)
+        if aggregate is None:
+            aggregate = self.by_condition[condition_id] = FillAggregate()
+        aggregate.count += 1
+        aggregate.total_size += size
+        aggregate.total_cost += cost
+
         # Call handler
         if self.on_fill:
             self.on_fill(fill_data)
-        
-        # Clean old fills (keep last 1000)
-        if len(self.recent_fills) > 1000:
-            oldest = min(self.recent_fills.keys(), key=lambda k: self.recent_fills[k].get('timestamp', 0))
-            del self.recent_fills[oldest]
+
+        # Keep the last max_fills
+        while len(self.recent_fills) > self.max_fills:
+            self._evict_oldest()
+
+    def remove_fill(self, order_id) -> bool:
+        """Take back a fill (e.g. its trade later failed)"""
+        entry = self.recent_fills.pop(order_id, None)
+        if entry is None:
+            return False
+        self._discount(entry)
+        return True
     
+    def _evict_oldest(self):
+        _, entry = self.recent_fills.popitem(last=False)
+        self._discount(entry)
+    
+    def _discount(self, entry):
+        _, condition_id, size, cost = entry
+        aggregate = self.by_condition[condition_id]
+        aggregate.count -= 1
+        if aggregate.count == 0:
+            del self.by_condition[condition_id]
+        else:
+            aggregate.total_size -= size
+            aggregate.total_cost -= cost
+
     def get_fill_summary(self, condition_id: str) -> Dict:
         """Get summary of fills for a market"""
-        fills = [
-            f for f in self.recent_fills.values()
-            if f.get('condition_id') == condition_id
-        ]
-        
-        total_size = sum(Decimal(str(f.get('size', 0))) for f in fills)
-        total_cost = sum(Decimal(str(f.get('price', 0))) * Decimal(str(f.get('size', 0))) for f in fills)
-        
+        aggregate = self.by_condition.get(condition_id) or FillAggregate()
+        total_size = aggregate.total_size
+        total_cost = aggregate.total_cost
+
         return {
-            'count': len(fills),
+            'count': aggregate.count,
             'total_size': float(total_size),
             'total_cost': float(total_cost),
             'avg_price': float(total_cost / total_size) if total_size > 0 else 0
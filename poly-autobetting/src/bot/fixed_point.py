@@ -0,0 +1,88 @@
+# Fixed Point
+"""
+Integer prices, sizes and amounts: ticks, micro-shares and micro-USDC
+"""
+from decimal import Decimal
+from typing import Union
+
+import numpy as np
+
+from src.api.codec import TICKS_PER_UNIT
+
+
+# Prices are integer ticks of 1/TICKS_PER_UNIT (0.0001, the finest CLOB
+# tick size, so every valid price is a whole number of ticks). Sizes and USDC amounts use 6 decimals like the
+# on-chain tokens, so every product below is exact integer arithmetic.
+MICROS_PER_UNIT = 1_000_000
+
+Number = Union[int, float, str, Decimal]
+
+
+# -- API boundary conversions ---------------------------------------------
+
+def price_to_ticks(price: Number) -> int:
+    """Convert a price (str/float/Decimal) to integer ticks"""
+    return int(round(float(price) * TICKS_PER_UNIT))
+
+
+def ticks_to_price(ticks: int) -> float:
+    return ticks / TICKS_PER_UNIT
+
+
+def ticks_to_decimal(ticks: int) -> Decimal:
+    """Exact Decimal price for order payloads"""
+    return Decimal(int(ticks)) / TICKS_PER_UNIT
+
+
+def to_micros(value: Number) -> int:
+    """Convert a size or USDC amount to integer micro-units"""
+    if isinstance(value, int):
+        return value * MICROS_PER_UNIT
+    if isinstance(value, float):
+        return int(round(value * MICROS_PER_UNIT))
+    return int((Decimal(str(value)) * MICROS_PER_UNIT).to_integral_value())
+
+
+def micros_to_decimal(micros: int) -> Decimal:
+    """Exact Decimal for payloads and reporting"""
+    return Decimal(int(micros)) / MICROS_PER_UNIT
+
+
+def micros_to_float(micros: int) -> float:
+    return micros / MICROS_PER_UNIT
+
+
+# -- Arithmetic (scalars or NumPy int64 arrays) ---------------------------
+
+def cost_micros(price_ticks, size_micros):
+    """USDC cost in micros of `size_micros` shares at `price_ticks`"""
+    return price_ticks * size_micros // TICKS_PER_UNIT
+
+
+def spread_ticks(bid_ticks, ask_ticks):
+    return ask_ticks - bid_ticks
+
+
+def spread_bps(bid_ticks, ask_ticks):
+    """Spread relative to the bid in basis points (0 where bid is 0)"""
+    if isinstance(bid_ticks, int) and isinstance(ask_ticks, int):
+        return (ask_ticks - bid_ticks) * 10_000 // bid_ticks if bid_ticks > 0 else 0
+    bid = np.asarray(bid_ticks, dtype=np.int64)
+    spread = np.asarray(ask_ticks, dtype=np.int64) - bid
+    result = np.where(bid > 0, spread * 10_000 // np.where(bid > 0, bid, 1), 0)
+    return int(result) if result.ndim == 0 else result
+
+
+def arb_profit_ticks(price_a_ticks, price_b_ticks, fee_bps: int = 0):
+    """
+    Per-share profit in ticks of buying both outcomes (one pays $1),
+    net of a fee charged on the cost, rounded down
+    """
+    cost = price_a_ticks + price_b_ticks
+    fee = -(-cost * fee_bps // 10_000) if fee_bps else 0  # round the fee up
+    return TICKS_PER_UNIT - cost - fee
+
+
+def fee_to_bps(fee: Number) -> int:
+    """Fee rate (e.g. Decimal('0.002')) as integer basis points"""
+    return int((Decimal(str(fee)) * 10_000).to_integral_value())
@@ -0,0 +1,262 @@
+# Liquidity Model
+"""
+Per-market fill likelihood from local book depth and recent trade flow
+"""
+import asyncio
+import bisect
+import math
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+from src.api.clob import ClobAPI
+from src.bot.fixed_point import Number, price_to_ticks
+from src.bot.order_book import OrderBook, OrderBookManager
+from src.bot.token_cache import extract_token_ids, market_condition_id
+
+
+@dataclass
+class LegLiquidity:
+    """Liquidity around our bid on one outcome token"""
+    token_id: str
+    price_ticks: int
+    has_book: bool = False
+    best_ask: Optional[int] = None
+    queue_ahead: float = 0.0  # bid depth at or above our price
+    trade_rate: float = 0.0  # shares/sec traded over the trade window
+    fill_probability: float = 0.0
+
+
+@dataclass
+class MarketLiquidity:
+    """Cached liquidity state for one market, refreshed incrementally"""
+    condition_id: str
+    order_size: float
+    legs: List[LegLiquidity]
+    trades: deque = field(default_factory=deque)  # (timestamp, trade_id, token_id, size)
+    seen_trades: set = field(default_factory=set)
+    trades_loaded: bool = False
+    last_trade_refresh: float = 0.0
+    last_watched: float = field(default_factory=time.time)
+
+    @property
+    def ready(self) -> bool:
+        """Books for every leg and at least one trade refresh"""
+        return self.trades_loaded and all(leg.has_book for leg in self.legs)
+
+    @property
+    def min_fill_probability(self) -> float:
+        return min((leg.fill_probability for leg in self.legs), default=0.0)
+
+
+class LiquidityModel:
+    """
+    Estimates how likely our resting bids are to fill, per leg.
+
+    Book-derived fields update from OrderBookManager listener callbacks and
+    trade flow from a background REST refresh, so reading the cached state
+    never touches the network.
+
+    Fill probability is a Poisson estimate: a bid already crossed by the
+    best ask fills; otherwise the traded volume expected over `horizon`
+    must clear the queue ahead of us plus our own size.
+    """
+
+    def __init__(
+        self,
+        book_manager: OrderBookManager,
+        clob_api: Optional[ClobAPI] = None,
+        trade_window: float = 300.0,
+        horizon: float = 60.0,
+        trade_refresh_interval: float = 15.0,
+        idle_after: float = 1800.0
+    ):
+        """
+        Args:
+            book_manager: Source of local books
+            clob_api: For recent market trades
+            trade_window: Seconds of trades used for the trade rate
+            horizon: Seconds an order is expected to rest
+            trade_refresh_interval: Seconds between trade refreshes per market
+            idle_after: Forget markets not watched for this many seconds
+        """
+        self.book_manager = book_manager
+        self.clob_api = clob_api or book_manager.clob_api
+        self.trade_window = trade_window
+        self.horizon = horizon
+        self.trade_refresh_interval = trade_refresh_interval
+        self.idle_after = idle_after
+
+        self.markets: Dict[str, MarketLiquidity] = {}
+        self.legs_by_token: Dict[str, List[tuple]] = {}  # token_id -> [(market, leg)]
+        self.running = False
+        self._task: Optional[asyncio.Task] = None
+
+        book_manager.add_listener(self.on_book_update)
+
+    def watch(self, market: dict, price: Number, order_size: float) -> List[str]:
+        """
+        Track a market for bids of `order_size` shares at `price`
+
+        Returns:
+            Token IDs not seen before (to subscribe on the book feed)
+        """
+        condition_id = market_condition_id(market)
+        if not condition_id:
+            return []
+        if condition_id in self.markets:
+            self.markets[condition_id].last_watched = time.time()
+            return []
+
+        price_ticks = price_to_ticks(price)
+        state = MarketLiquidity(
+            condition_id=condition_id,
+            order_size=order_size,
+            legs=[LegLiquidity(token_id, price_ticks) for token_id in extract_token_ids(market)]
+        )
+        self.markets[condition_id] = state
+
+        new_tokens = []
+        for leg in state.legs:
+            if leg.token_id not in self.legs_by_token:
+                new_tokens.append(leg.token_id)
+            self.legs_by_token.setdefault(leg.token_id, []).append((state, leg))
+            book = self.book_manager.get_book(leg.token_id)
+            if book is not None:
+                self._update_book(leg, book)
+            self._update_probability(state, leg)
+        return new_tokens
+
+    def forget(self, condition_id: str):
+        """Stop tracking a market"""
+        state = self.markets.pop(condition_id, None)
+        if state is None:
+            return
+        for leg in state.legs:
+            entries = [e for e in self.legs_by_token.get(leg.token_id, []) if e[0] is not state]
+            if entries:
+                self.legs_by_token[leg.token_id] = entries
+            else:
+                self.legs_by_token.pop(leg.token_id, None)
+
+    def prune(self):
+        """Forget markets nobody has watched recently (resolved/rotated out)"""
+        cutoff = time.time() - self.idle_after
+        for condition_id in [c for c, s in self.markets.items() if s.last_watched < cutoff]:
+            self.forget(condition_id)
+
+    def get(self, condition_id: str) -> Optional[MarketLiquidity]:
+        """Cached state (no network)"""
+        return self.markets.get(condition_id)
+
+    # -- Book updates -------------------------------------------------------
+
+    def on_book_update(self, token_id: str, book: OrderBook):
+        """OrderBookManager listener: refresh only this token's legs"""
+        for state, leg in self.legs_by_token.get(token_id, ()):
+            self._update_book(leg, book)
+            self._update_probability(state, leg)
+
+    def _update_book(self, leg: LegLiquidity, book: OrderBook):
+        leg.has_book = book.valid
+        if not book.valid:
+            # Depth is stale until the resync; the market isn't ready meanwhile
+            leg.best_ask = None
+            leg.queue_ahead = 0.0
+            return
+        leg.best_ask = book.asks.best()
+        bid_ticks = book.bids.ticks
+        levels = book.bids.levels
+        leg.queue_ahead = sum(levels[t] for t in bid_ticks[bisect.bisect_left(bid_ticks, leg.price_ticks):])
+
+    def _update_probability(self, state: MarketLiquidity, leg: LegLiquidity):
+        if leg.best_ask is not None and leg.best_ask <= leg.price_ticks:
+            leg.fill_probability = 1.0
+            return
+        expected_volume = leg.trade_rate * self.horizon
+        needed = leg.queue_ahead + state.order_size
+        leg.fill_probability = 1 - math.exp(-expected_volume / needed) if needed > 0 else 0.0
+
+    # -- Trade flow ---------------------------------------------------------
+
+    def record_trades(self, condition_id: str, trades: List[Dict], now: Optional[float] = None):
+        """Merge recent trades (already-seen ids are skipped) and refresh rates"""
+        state = self.markets.get(condition_id)
+        if state is None:
+            return
+        now = now or time.time()
+        cutoff = now - self.trade_window
+
+        fresh = []
+        for trade in trades:
+            timestamp = _trade_time(trade)
+            if timestamp < cutoff:
+                continue
+            trade_id = trade.get('id') or (timestamp, trade.get('asset_id'), trade.get('price'), trade.get('size'))
+            if trade_id in state.seen_trades:
+                continue
+            state.seen_trades.add(trade_id)
+            fresh.append((timestamp, trade_id, trade.get('asset_id'), float(trade.get('size') or 0)))
+        if fresh:
+            fresh.sort(key=lambda t: t[0])
+            in_order = not state.trades or state.trades[-1][0] <= fresh[0][0]
+            state.trades.extend(fresh)
+            if not in_order:
+                state.trades = deque(sorted(state.trades, key=lambda t: t[0]))
+
+        # Drop trades that left the window
+        while state.trades and state.trades[0][0] < cutoff:
+            _, trade_id, _, _ = state.trades.popleft()
+            state.seen_trades.discard(trade_id)
+
+        volume: Dict[str, float] = {}
+        for _, _, token_id, size in state.trades:
+            volume[token_id] = volume.get(token_id, 0.0) + size
+        for leg in state.legs:
+            leg.trade_rate = volume.get(leg.token_id, 0.0) / self.trade_window
+            self._update_probability(state, leg)
+
+        state.trades_loaded = True
+        state.last_trade_refresh = now
+
+    async def refresh_trades(self, force: bool = False):
+        """Fetch recent trades for every market whose refresh is due, concurrently"""
+        now = time.time()
+        due = [
+            cid for cid, state in self.markets.items()
+            if force or now - state.last_trade_refresh >= self.trade_refresh_interval
+        ]
+        if not due:
+            return
+        results = await asyncio.gather(
+            *[self.clob_api.get_market_trades(cid) for cid in due],
+            return_exceptions=True
+        )
+        for condition_id, trades in zip(due, results):
+            if isinstance(trades, Exception):
+                print(f"Liquidity trades error for {condition_id}: {trades}")
+            else:
+                self.record_trades(condition_id, trades, now)
+
+    async def _run(self):
+        while self.running:
+            self.prune()
+            await self.refresh_trades()
+            await asyncio.sleep(1.0)
+
+    def start(self):
+        """Start the background trade refresh"""
+        self.running = True
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        self.running = False
+        if self._task:
+            self._task.cancel()
+
+
+def _trade_time(trade: Dict) -> float:
+    """Trade timestamp in seconds (API mixes seconds and milliseconds)"""
+    value = float(trade.get('match_time') or trade.get('timestamp') or 0)
+    return value / 1000 if value > 10 ** 12 else value
@@ -0,0 +1,239 @@
+"""
+Market Catalog - One shared Gamma market snapshot for every scheduler
+"""
+import asyncio
+import re
+import time
+from functools import lru_cache
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from src.api.gamma import GammaAPI, parse_iso_ts
+from src.bot.market_index import MarketIndex
+from src.bot.token_cache import market_condition_id
+
+
+# Description keywords per asset
+ASSET_ALIASES: Dict[str, Tuple[str, ...]] = {
+    'BTC': ('btc', 'bitcoin'),
+    'ETH': ('eth', 'ethereum'),
+    'SOL': ('sol', 'solana'),
+    'XRP': ('xrp', 'ripple'),
+}
+
+
+@lru_cache(maxsize=None)
+def _asset_pattern(asset: str) -> Pattern:
+    aliases = ASSET_ALIASES.get(asset.upper(), (asset.lower(),))
+    return re.compile(r'\b(?:' + '|'.join(re.escape(alias) for alias in aliases) + r')\b')
+
+
+@lru_cache(maxsize=None)
+def _timeframe_pattern(timeframe: int) -> Pattern:
+    # Patterns: "5 min", "5min", "15 minute", "15-minute", etc.
+    return re.compile(rf'\b{timeframe}(\s*|-)min', re.IGNORECASE)
+
+
+def matches_market(market: dict, asset: str, timeframe: int) -> bool:
+    """Check if a market is for `asset` with a `timeframe`-minute duration"""
+    description = market.get('description', '').lower()
+
+    # Check for the asset
+    if not _asset_pattern(asset).search(description):
+        return False
+
+    # Check for timeframe in description
+    if _timeframe_pattern(timeframe).search(description):
+        return True
+
+    # Alternative: check market metadata/tags
+    tags = market.get('tags', [])
+    if f"{timeframe}min" in tags:
+        return True
+
+    return False
+
+
+class MarketCatalog:
+    """
+    Fetches the Gamma market list once per refresh and serves it, already
+    partitioned by (asset, timeframe), to every MarketScheduler. Each view
+    is also kept as a MarketIndex sorted by expiry and start time.
+
+    The first refresh pulls every page concurrently; later refreshes only
+    fetch markets updated since the last sync (watermark on `updatedAt`),
+    with a periodic full resync as a safety net.
+    """
+
+    def __init__(
+        self,
+        refresh_interval: float = 5.0,
+        gamma_api: Optional[GammaAPI] = None,
+        full_resync_interval: float = 600.0,
+        page_size: int = 100,
+        page_concurrency: int = 4
+    ):
+        """
+        Args:
+            refresh_interval: Seconds a snapshot stays fresh
+            gamma_api: Gamma client (shares the process-wide transport)
+            full_resync_interval: Seconds between full paginated syncs
+            page_size: Markets per Gamma page
+            page_concurrency: Pages fetched in parallel on a full sync
+        """
+        self.refresh_interval = refresh_interval
+        self.gamma_api = gamma_api or GammaAPI()
+        self.full_resync_interval = full_resync_interval
+        self.page_size = page_size
+        self.page_concurrency = page_concurrency
+
+        self.indexes: Dict[Tuple[str, int], MarketIndex] = {}
+        self.last_refresh: Optional[float] = None
+        self.last_full_sync: Optional[float] = None
+        self.watermark: Optional[float] = None  # max updatedAt seen (epoch)
+
+        self._markets: Dict[str, Dict] = {}  # condition_id -> market
+        self._views: Dict[Tuple[str, int], Dict[str, Dict]] = {}
+        self._inflight: Optional[asyncio.Task] = None
+
+    @property
+    def markets(self) -> List[Dict]:
+        return list(self._markets.values())
+
+    def register(self, asset: str, timeframe: int):
+        """Register an (asset, timeframe) view to partition on every refresh"""
+        key = (asset.upper(), timeframe)
+        if key not in self._views:
+            self._views[key] = {}
+            self.indexes[key] = MarketIndex()
+            for condition_id, market in self._markets.items():
+                self._place(key, condition_id, market)
+
+    def is_stale(self) -> bool:
+        if self.last_refresh is None:
+            return True
+        return time.monotonic() - self.last_refresh >= self.refresh_interval
+
+    async def get_markets(self) -> List[Dict]:
+        """Get the full market snapshot, refreshing if stale"""
+        if self.is_stale():
+            await self.refresh()
+        return self.markets
+
+    async def get_view(self, asset: str, timeframe: int) -> List[Dict]:
+        """Get the markets for one (asset, timeframe), refreshing if stale"""
+        self.register(asset, timeframe)
+        if self.is_stale():
+            await self.refresh()
+        return list(self._views[(asset.upper(), timeframe)].values())
+
+    async def get_index(self, asset: str, timeframe: int) -> MarketIndex:
+        """Get the expiry/start index for one (asset, timeframe)"""
+        self.register(asset, timeframe)
+        if self.is_stale():
+            await self.refresh()
+        return self.indexes[(asset.upper(), timeframe)]
+
+    async def refresh(self):
+        """Refresh the snapshot; concurrent callers share one in-flight fetch"""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.ensure_future(self._refresh())
+        await asyncio.shield(self._inflight)
+
+    async def _refresh(self):
+        now = time.monotonic()
+        needs_full = (
+            self.watermark is None
+            or self.last_full_sync is None
+            or now - self.last_full_sync >= self.full_resync_interval
+        )
+
+        try:
+            if not needs_full:
+                changed = await self.gamma_api.get_markets_updated_since(
+                    self.watermark, page_size=self.page_size
+                )
+                if changed is None:
+                    # Too much changed to walk - fall back to a full sync
+                    needs_full = True
+                else:
+                    self._apply_delta(changed)
+
+            if needs_full:
+                markets = await self.gamma_api.get_all_markets(
+                    page_size=self.page_size, concurrency=self.page_concurrency
+                )
+                self._apply_full(markets)
+                self.last_full_sync = now
+        except Exception as e:
+            # Keep serving the previous snapshot
+            print(f"Failed to fetch markets: {e}")
+            return
+
+        self.last_refresh = now
+
+    def _apply_full(self, markets: List[Dict]):
+        """Replace the snapshot with a full market list"""
+        fresh = {}
+        for market in markets:
+            condition_id = market_condition_id(market)
+            if condition_id and self._is_live(market):
+                fresh[condition_id] = market
+
+        for condition_id in [c for c in self._markets if c not in fresh]:
+            self._drop(condition_id)
+        for condition_id, market in fresh.items():
+            self._upsert(condition_id, market)
+
+        self._advance_watermark(markets)
+
+    def _apply_delta(self, changed: List[Dict]):
+        """Merge markets updated since the watermark"""
+        for market in changed:
+            condition_id = market_condition_id(market)
+            if not condition_id:
+                continue
+            if self._is_live(market):
+                self._upsert(condition_id, market)
+            else:
+                self._drop(condition_id)
+
+        self._advance_watermark(changed)
+
+    def _advance_watermark(self, markets: List[Dict]):
+        for market in markets:
+            updated = parse_iso_ts(market.get('updatedAt') or market.get('updated_at'))
+            if updated is not None and (self.watermark is None or updated > self.watermark):
+                self.watermark = updated
+        if self.watermark is None:
+            # Gamma sent no update times - keep doing full syncs
+            self.last_full_sync = None
+
+    def _upsert(self, condition_id: str, market: Dict):
+        self._markets[condition_id] = market
+        for key in self._views:
+            self._place(key, condition_id, market)
+
+    def _drop(self, condition_id: str):
+        self._markets.pop(condition_id, None)
+        for key, members in self._views.items():
+            if members.pop(condition_id, None) is not None:
+                self.indexes[key].remove(condition_id)
+
+    def _place(self, key: Tuple[str, int], condition_id: str, market: Dict):
+        """Put a market in (or take it out of) one view"""
+        asset, timeframe = key
+        members = self._views[key]
+        if matches_market(market, asset, timeframe):
+            members[condition_id] = market
+            self.indexes[key].upsert(market)
+        elif members.pop(condition_id, None) is not None:
+            self.indexes[key].remove(condition_id)
+
+    @staticmethod
+    def _is_live(market: Dict) -> bool:
+        """Market is active and neither closed nor archived"""
+        return (
+            market.get('active', True)
+            and not market.get('closed', False)
+            and not market.get('archived', False)
+        )
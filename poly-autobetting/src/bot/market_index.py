@@ -0,0 +1,126 @@
+"""
+Market Index - Markets kept sorted by expiry and start time
+"""
+import bisect
+import math
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.api.gamma import parse_iso_ts
+from src.bot.token_cache import market_condition_id
+
+
+def market_end_ts(market: dict) -> Optional[float]:
+    return parse_iso_ts(market.get('end_date_iso') or market.get('endDate'))
+
+
+def market_start_ts(market: dict) -> Optional[float]:
+    return parse_iso_ts(market.get('start_date_iso') or market.get('startDate'))
+
+
+@dataclass
+class IndexedMarket:
+    """A market with its timestamps parsed once"""
+    condition_id: str
+    market: dict
+    end_ts: float  # inf when the market has no end date
+    start_ts: Optional[float]
+
+
+class MarketIndex:
+    """
+    Incrementally updated index of markets by expiry and start time.
+
+    Both orderings are bisect-sorted lists of (timestamp, condition_id), so
+    "expiring within X seconds" and "next N to open" are O(log n) lookups
+    plus the size of the answer.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, IndexedMarket] = {}
+        self._by_end: List[Tuple[float, str]] = []
+        self._by_start: List[Tuple[float, str]] = []
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, condition_id: str) -> bool:
+        return condition_id in self.entries
+
+    def get(self, condition_id: str) -> Optional[IndexedMarket]:
+        return self.entries.get(condition_id)
+
+    def upsert(self, market: dict):
+        """Add or update one market"""
+        condition_id = market_condition_id(market)
+        if not condition_id:
+            return
+
+        end_ts = market_end_ts(market)
+        start_ts = market_start_ts(market)
+        end_ts = end_ts if end_ts is not None else math.inf
+
+        existing = self.entries.get(condition_id)
+        if existing is not None:
+            if existing.end_ts == end_ts and existing.start_ts == start_ts:
+                # Timestamps unchanged - just swap in the fresh dict
+                existing.market = market
+                return
+            self._unlink(existing)
+
+        entry = IndexedMarket(condition_id, market, end_ts, start_ts)
+        self.entries[condition_id] = entry
+        bisect.insort(self._by_end, (end_ts, condition_id))
+        if start_ts is not None:
+            bisect.insort(self._by_start, (start_ts, condition_id))
+
+    def remove(self, condition_id: str):
+        """Drop one market from the index"""
+        entry = self.entries.pop(condition_id, None)
+        if entry is not None:
+            self._unlink(entry)
+
+    def sync(self, markets: Iterable[dict]):
+        """Make the index match `markets`, touching only what changed"""
+        seen = set()
+        for market in markets:
+            condition_id = market_condition_id(market)
+            if condition_id:
+                seen.add(condition_id)
+                self.upsert(market)
+
+        for condition_id in [c for c in self.entries if c not in seen]:
+            self.remove(condition_id)
+
+    def active(self, now: float) -> List[dict]:
+        """Markets not yet expired, soonest expiry first"""
+        lo = bisect.bisect_left(self._by_end, (now, ''))
+        return [self.entries[c].market for _, c in self._by_end[lo:]]
+
+    def expiring_within(self, seconds: float, now: float) -> List[dict]:
+        """Markets expiring in [now, now + seconds], soonest first"""
+        lo = bisect.bisect_left(self._by_end, (now, ''))
+        hi = bisect.bisect_right(self._by_end, (now + seconds, '\uffff'))
+        return [self.entries[c].market for _, c in self._by_end[lo:hi]]
+
+    def starting_between(self, start: float, end: float) -> List[dict]:
+        """Markets opening in [start, end], soonest first"""
+        lo = bisect.bisect_left(self._by_start, (start, ''))
+        hi = bisect.bisect_right(self._by_start, (end, '\uffff'))
+        return [self.entries[c].market for _, c in self._by_start[lo:hi]]
+
+    def next_to_open(self, n: int, now: float) -> List[dict]:
+        """The next `n` markets to open after `now`"""
+        lo = bisect.bisect_left(self._by_start, (now, ''))
+        return [self.entries[c].market for _, c in self._by_start[lo:lo + n]]
+
+    def _unlink(self, entry: IndexedMarket):
+        self._remove_sorted(self._by_end, (entry.end_ts, entry.condition_id))
+        if entry.start_ts is not None:
+            self._remove_sorted(self._by_start, (entry.start_ts, entry.condition_id))
+
+    @staticmethod
+    def _remove_sorted(items: List[Tuple[float, str]], item: Tuple[float, str]):
+        i = bisect.bisect_left(items, item)
+        if i < len(items) and items[i] == item:
+            del items[i]
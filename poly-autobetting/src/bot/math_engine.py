@@ -5,6 +5,13 @@ Pricing and math utilities
 from decimal import Decimal, ROUND_HALF_UP
 from typing import Tuple
 
+from src.api.codec import TICKS_PER_UNIT
+from src.bot.fixed_point import (
+    arb_profit_ticks,
+    price_to_ticks,
+    ticks_to_decimal,
+)
+
 
 class MathEngine:
     """Math utilities for pricing calculations"""
@@ -35,11 +42,17 @@ class MathEngine:
         Calculate profit from buying both sides
         Returns profit per $1 of payout
         """
-        total_cost = buy_price_a + buy_price_b
-        return Decimal('1.0') - total_cost
+        profit = arb_profit_ticks(price_to_ticks(buy_price_a), price_to_ticks(buy_price_b))
+        return ticks_to_decimal(profit)
     
     @staticmethod
     def is_arbitrage_opportunity(price_a: Decimal, price_b: Decimal, min_profit: Decimal = Decimal('0.01')) -> bool:
         """Check if buying both sides is profitable"""
-        profit = MathEngine.calculate_arbitrage_profit(price_a, price_b)
-        return profit >= min_profit
+        return MathEngine.is_arbitrage_opportunity_ticks(
+            price_to_ticks(price_a), price_to_ticks(price_b), price_to_ticks(min_profit)
+        )
+    
+    @staticmethod
+    def is_arbitrage_opportunity_ticks(price_a: int, price_b: int, min_profit: int = TICKS_PER_UNIT // 100, fee_bps: int = 0) -> bool:
+        """Integer-tick variant for hot paths (scalars or NumPy arrays); min_profit defaults to $0.01"""
+        return arb_profit_ticks(price_a, price_b, fee_bps) >= min_profit
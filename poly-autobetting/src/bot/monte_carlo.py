@@ -0,0 +1,232 @@
+# Monte Carlo
+"""
+Monte Carlo fill-risk simulation for the dual-sided strategy
+"""
+import asyncio
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+
+import numpy as np
+
+from src.api.gamma import GammaAPI, market_winner
+from src.bot.position_tracker import PositionTracker
+
+
+# Round outcomes per market: both legs filled, one leg filled and won,
+# one leg filled and lost, nothing filled
+BOTH, ONE_WIN, ONE_LOSE, NONE = range(4)
+
+
+@dataclass
+class FillModel:
+    """
+    Fill-state counts fitted from recorded positions, used as Dirichlet /
+    Beta posteriors (with a uniform prior) when drawing probabilities
+    """
+    both: int = 0
+    up_only: int = 0
+    down_only: int = 0
+    unfilled: int = 0
+    one_sided_wins: int = 0
+    one_sided_losses: int = 0
+
+    @property
+    def observations(self) -> int:
+        return self.both + self.up_only + self.down_only + self.unfilled
+
+    def probabilities(self) -> np.ndarray:
+        """Posterior-mean probabilities of (both, one-win, one-lose, none)"""
+        fill = np.array([self.both, self.up_only + self.down_only, self.unfilled], dtype=np.float64) + 1
+        fill /= fill.sum()
+        win = (self.one_sided_wins + 1) / (self.one_sided_wins + self.one_sided_losses + 2)
+        return np.array([fill[0], fill[1] * win, fill[1] * (1 - win), fill[2]])
+
+    def sample_probabilities(self, rng: np.random.Generator, n: int) -> np.ndarray:
+        """(n, 4) probability vectors drawn from the posterior"""
+        fill = rng.dirichlet([self.both + 1, self.up_only + self.down_only + 1, self.unfilled + 1], size=n)
+        win = rng.beta(self.one_sided_wins + 1, self.one_sided_losses + 1, size=n)
+        return np.column_stack([fill[:, 0], fill[:, 1] * win, fill[:, 1] * (1 - win), fill[:, 2]])
+
+    @classmethod
+    def fit(cls, positions: Iterable, winners: Optional[Dict[str, int]] = None) -> 'FillModel':
+        """
+        Count fill states over resolved positions
+
+        A position counts once its market's winner is known (from `winners`,
+        condition_id -> winning outcome index, or a 'winner' field); a
+        one-sided fill wins when its filled leg is the winner. Redeem state
+        is ignored: the bot only redeems fully filled positions.
+
+        Accepts PositionTracker Position objects or their saved dicts.
+        """
+        winners = winners or {}
+        model = cls()
+        for p in positions:
+            get = p.get if isinstance(p, dict) else lambda k, d=None, p=p: getattr(p, k, d)
+            winner = winners.get(get('condition_id'), get('winner'))
+            if winner is None:
+                continue
+            up, down = bool(get('up_filled', False)), bool(get('down_filled', False))
+            if up and down:
+                model.both += 1
+            elif up or down:
+                if up:
+                    model.up_only += 1
+                else:
+                    model.down_only += 1
+                if (0 if up else 1) == winner:
+                    model.one_sided_wins += 1
+                else:
+                    model.one_sided_losses += 1
+            else:
+                model.unfilled += 1
+        return model
+
+    @classmethod
+    def from_state_file(cls, path: str, winners: Optional[Dict[str, int]] = None) -> 'FillModel':
+        """Fit from a positions_<tf>.json snapshot plus its event log tail"""
+        tracker = PositionTracker.read_only(path)
+        return cls.fit(tracker.positions.values(), winners)
+
+
+async def resolve_winners(condition_ids: Iterable[str], gamma_api: Optional[GammaAPI] = None) -> Dict[str, int]:
+    """Winning outcome index for each resolved market (unresolved ones omitted)"""
+    gamma_api = gamma_api or GammaAPI()
+    condition_ids = list(condition_ids)
+    markets = await asyncio.gather(
+        *[gamma_api.get_market(cid) for cid in condition_ids],
+        return_exceptions=True
+    )
+    winners = {}
+    for condition_id, market in zip(condition_ids, markets):
+        if isinstance(market, dict):
+            winner = market_winner(market)
+            if winner is not None:
+                winners[condition_id] = winner
+    return winners
+
+
+@dataclass
+class MonteCarloResult:
+    """Distribution of final P&L and drawdown over simulated paths"""
+    paths: int
+    rounds: int  # markets per path
+    mean_pnl: float
+    std_pnl: float
+    pnl_percentiles: Dict[int, float]
+    risk_of_ruin: float
+    drawdown_percentiles: Dict[int, float]  # max drawdown fraction
+    expected_pnl_per_round: float
+
+    def summary(self) -> str:
+        pnl = self.pnl_percentiles
+        dd = self.drawdown_percentiles
+        return (
+            f"{self.paths:,} paths x {self.rounds:,} markets: "
+            f"mean ${self.mean_pnl:.2f} (sd ${self.std_pnl:.2f}), "
+            f"P&L p5/p50/p95 ${pnl[5]:.2f}/${pnl[50]:.2f}/${pnl[95]:.2f}, "
+            f"ruin {self.risk_of_ruin:.2%}, max DD p95/p99 {dd[95]:.1%}/{dd[99]:.1%}"
+        )
+
+
+class MonteCarloRisk:
+    """Simulates many paths of markets for one timeframe configuration"""
+
+    PERCENTILES = (1, 5, 25, 50, 75, 95, 99)
+
+    def __init__(
+        self,
+        buy_price: Decimal,
+        max_positions: int,
+        model: FillModel,
+        order_size: float = 1.0
+    ):
+        """
+        Args:
+            buy_price: Limit price for both legs
+            max_positions: Markets traded concurrently per cycle
+            model: Fitted fill model
+            order_size: Shares per leg
+        """
+        self.buy_price = float(buy_price)
+        self.max_positions = max_positions
+        self.model = model
+        self.order_size = order_size
+
+    @classmethod
+    def for_timeframe(cls, tf_config, model: FillModel, order_size: float = 1.0) -> 'MonteCarloRisk':
+        """Build from a TimeframeConfig"""
+        return cls(tf_config.buy_price, tf_config.max_positions, model, order_size)
+
+    @property
+    def round_pnl(self) -> np.ndarray:
+        """P&L of one market in each round outcome"""
+        p = self.buy_price
+        return np.array([1 - 2 * p, 1 - p, -p, 0.0]) * self.order_size
+
+    def simulate(
+        self,
+        paths: int = 10000,
+        cycles: int = 1000,
+        initial_capital: float = 1000.0,
+        ruin_level: float = 0.0,
+        parameter_uncertainty: bool = True,
+        seed: Optional[int] = None,
+        chunk_size: int = 2000
+    ) -> MonteCarloResult:
+        """
+        Run the simulation
+
+        Each cycle trades `max_positions` markets; outcome counts per cycle
+        are one multinomial draw, so paths x cycles x max_positions rounds
+        cost only paths x cycles draws.
+
+        Args:
+            paths: Independent equity paths
+            cycles: Cycles per path
+            initial_capital: Starting equity
+            ruin_level: A path is ruined once equity falls to this
+            parameter_uncertainty: Draw each path's probabilities from the
+                posterior instead of using the point estimate
+            seed: RNG seed
+            chunk_size: Paths per batch (bounds memory)
+        """
+        rng = np.random.default_rng(seed)
+        round_pnl = self.round_pnl
+
+        final = np.empty(paths)
+        drawdown = np.empty(paths)
+        ruined = np.zeros(paths, dtype=bool)
+
+        for start in range(0, paths, chunk_size):
+            n = min(chunk_size, paths - start)
+            if parameter_uncertainty:
+                probs = self.model.sample_probabilities(rng, n)[:, None, :]
+            else:
+                probs = self.model.probabilities()
+            counts = rng.multinomial(self.max_positions, probs, size=(n, cycles))
+
+            equity = initial_capital + np.cumsum(counts @ round_pnl, axis=1)
+
+            # A ruined path stops trading where it went bust
+            bust = np.maximum.accumulate(equity <= ruin_level, axis=1)
+            first = bust.argmax(axis=1)
+            equity = np.where(bust, equity[np.arange(n), first][:, None], equity)
+
+            peak = np.maximum(np.maximum.accumulate(equity, axis=1), initial_capital)
+
+            final[start:start + n] = equity[:, -1] - initial_capital
+            drawdown[start:start + n] = ((peak - equity) / peak).max(axis=1)
+            ruined[start:start + n] = (equity <= ruin_level).any(axis=1)
+
+        return MonteCarloResult(
+            paths=paths,
+            rounds=cycles * self.max_positions,
+            mean_pnl=float(final.mean()),
+            std_pnl=float(final.std()),
+            pnl_percentiles={q: float(v) for q, v in zip(self.PERCENTILES, np.percentile(final, self.PERCENTILES))},
+            risk_of_ruin=float(ruined.mean()),
+            drawdown_percentiles={q: float(v) for q, v in zip(self.PERCENTILES, np.percentile(drawdown, self.PERCENTILES))},
+            expected_pnl_per_round=float(self.model.probabilities() @ round_pnl)
+        )
@@ -0,0 +1,157 @@
+# Optimizer
+"""
+Multi-process grid / random search over strategy parameters
+"""
+import csv
+import itertools
+import random
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from src.bot.vector_backtest import MarketArrays, metric_sign, run_sweep
+
+
+RESULT_COLUMNS = [
+    'rank', 'entry_price', 'max_positions', 'stop_loss', 'size',
+    'total_profit', 'trades', 'wins', 'one_sided', 'unfilled',
+    'max_drawdown', 'sharpe',
+]
+
+
+@dataclass
+class ParameterSpace:
+    """
+    Values to search, mirroring TimeframeConfig (buy price, max positions)
+    and the enhanced bot's BotConfig (stop-loss, position size)
+    """
+    entry_prices: Sequence[float] = (0.45,)
+    max_positions: Sequence[int] = (10,)
+    stop_losses: Sequence[Optional[float]] = (None,)
+    sizes: Sequence[float] = (1.0,)
+
+    @property
+    def size(self) -> int:
+        return len(self.entry_prices) * len(self.max_positions) * len(self.stop_losses) * len(self.sizes)
+
+    def grid_tasks(self) -> List[Tuple]:
+        """
+        One task per (max_positions, stop_loss); entry prices and sizes are
+        swept inside the vectorized kernel
+        """
+        return [
+            (max_pos, stop_loss, list(self.entry_prices), list(self.sizes), None)
+            for max_pos, stop_loss in itertools.product(self.max_positions, self.stop_losses)
+        ]
+
+    def random_tasks(self, samples: int, seed: Optional[int] = None) -> List[Tuple]:
+        """
+        `samples` distinct points drawn from the grid, one task per
+        (max_positions, stop_loss): the kernel sweeps the sampled entry
+        prices x sizes together and only the sampled pairs are kept
+        """
+        rng = random.Random(seed)
+        points = list(itertools.product(self.entry_prices, self.max_positions, self.stop_losses, self.sizes))
+        chosen = rng.sample(points, min(samples, len(points)))
+
+        grouped: Dict[Tuple, List[Tuple[float, float]]] = {}
+        for entry, max_pos, stop_loss, size in chosen:
+            grouped.setdefault((max_pos, stop_loss), []).append((entry, size))
+        return [
+            (
+                max_pos,
+                stop_loss,
+                sorted({e for e, _ in pairs}),
+                sorted({z for _, z in pairs}),
+                pairs
+            )
+            for (max_pos, stop_loss), pairs in grouped.items()
+        ]
+
+
+# Per-worker dataset, memory-mapped once in the pool initializer
+_DATA: Optional[MarketArrays] = None
+_CAPITAL = 1000.0
+
+
+def _init_worker(data_dir: str, initial_capital: float):
+    global _DATA, _CAPITAL
+    _DATA = MarketArrays.load(data_dir, mmap=True)
+    _CAPITAL = initial_capital
+
+
+def _run_task(task: Tuple) -> List[Dict]:
+    max_pos, stop_loss, entry_prices, sizes, pairs = task
+    result = run_sweep(_DATA.capped(max_pos), entry_prices, [stop_loss], sizes, _CAPITAL)
+    rows = result.ranked()
+    if pairs is not None:
+        keep = {(float(e), float(z)) for e, z in pairs}
+        rows = [r for r in rows if (r['entry_price'], r['size']) in keep]
+    for row in rows:
+        row['max_positions'] = max_pos
+    return rows
+
+
+@dataclass
+class Optimizer:
+    """
+    Fans backtest sweeps across a process pool
+
+    The dataset is written once as .npy columns and memory-mapped by every
+    worker, so tasks only pickle a handful of parameters.
+    """
+    data: MarketArrays
+    workers: Optional[int] = None  # default: os.cpu_count()
+    initial_capital: float = 1000.0
+    metric: str = 'sharpe'
+    results: List[Dict] = field(default_factory=list)
+
+    def run_grid(self, space: ParameterSpace) -> List[Dict]:
+        """Evaluate every grid point"""
+        return self._run(space.grid_tasks(), space.size)
+
+    def run_random(self, space: ParameterSpace, samples: int, seed: Optional[int] = None) -> List[Dict]:
+        """Evaluate `samples` random grid points"""
+        return self._run(space.random_tasks(samples, seed), min(samples, space.size))
+
+    def _run(self, tasks: List[Tuple], points: int) -> List[Dict]:
+        started = time.time()
+        data_dir = tempfile.mkdtemp(prefix="backtest-data-")
+        rows: List[Dict] = []
+        try:
+            self.data.save(data_dir)
+            with ProcessPoolExecutor(
+                max_workers=self.workers,
+                initializer=_init_worker,
+                initargs=(data_dir, self.initial_capital)
+            ) as pool:
+                futures = [pool.submit(_run_task, task) for task in tasks]
+                for done, future in enumerate(as_completed(futures), 1):
+                    try:
+                        rows.extend(future.result())
+                    except Exception as e:
+                        print(f"Optimizer task failed: {e}")
+                    if done % max(1, len(futures) // 10) == 0:
+                        print(f"Optimizer: {done}/{len(futures)} tasks")
+        finally:
+            shutil.rmtree(data_dir, ignore_errors=True)
+
+        sign = metric_sign(self.metric)
+        rows.sort(key=lambda r: sign * r[self.metric], reverse=True)
+        for rank, row in enumerate(rows, 1):
+            row['rank'] = rank
+        self.results = rows
+        print(f"Optimizer: {len(rows)}/{points} points in {time.time() - started:.1f}s")
+        return rows
+
+    def write_csv(self, path: str, top: Optional[int] = None):
+        """Write the ranked results table"""
+        rows = self.results[:top] if top else self.results
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=RESULT_COLUMNS, extrasaction='ignore')
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Wrote {len(rows)} results to {path}")
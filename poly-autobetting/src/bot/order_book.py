@@ -0,0 +1,293 @@
+# Order Book
+"""
+Local incremental L2 order books built from the WebSocket feed
+"""
+import asyncio
+import bisect
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.api.clob import ClobAPI
+from src.api.codec import TICKS_PER_UNIT
+from src.bot.fixed_point import price_to_ticks, ticks_to_price
+
+
+class BookSide:
+    """One side of a book: size per tick plus the ticks kept sorted"""
+
+    def __init__(self, is_bid: bool):
+        self.is_bid = is_bid
+        self.levels: Dict[int, float] = {}  # tick -> size
+        self.ticks: List[int] = []  # ascending
+
+    def __len__(self) -> int:
+        return len(self.ticks)
+
+    def clear(self):
+        self.levels.clear()
+        self.ticks.clear()
+
+    def set(self, tick: int, size: float):
+        """Set the size at a price level (size <= 0 removes it)"""
+        if size <= 0:
+            if self.levels.pop(tick, None) is not None:
+                i = bisect.bisect_left(self.ticks, tick)
+                del self.ticks[i]
+            return
+
+        if tick not in self.levels:
+            bisect.insort(self.ticks, tick)
+        self.levels[tick] = size
+
+    def load(self, levels: Iterable[Dict]):
+        """Replace the whole side from [{'price': '0.45', 'size': '100'}, ...]"""
+        self.levels = {}
+        for level in levels:
+            size = float(level['size'])
+            if size > 0:
+                self.levels[price_to_ticks(level['price'])] = size
+        self.ticks = sorted(self.levels)
+
+    def best(self) -> Optional[int]:
+        """Best tick: highest bid / lowest ask"""
+        if not self.ticks:
+            return None
+        return self.ticks[-1] if self.is_bid else self.ticks[0]
+
+    def size_at(self, tick: int) -> float:
+        return self.levels.get(tick, 0.0)
+
+    def depth_within(self, tick: int, n_ticks: int) -> float:
+        """Total size from `tick` up to `n_ticks` away, towards worse prices"""
+        if self.is_bid:
+            lo = bisect.bisect_left(self.ticks, tick - n_ticks)
+            hi = bisect.bisect_right(self.ticks, tick)
+        else:
+            lo = bisect.bisect_left(self.ticks, tick)
+            hi = bisect.bisect_right(self.ticks, tick + n_ticks)
+        return sum(self.levels[t] for t in self.ticks[lo:hi])
+
+    def levels_from_best(self) -> List[Tuple[int, float]]:
+        """(tick, size) from best to worst"""
+        ticks = reversed(self.ticks) if self.is_bid else self.ticks
+        return [(t, self.levels[t]) for t in ticks]
+
+
+class OrderBook:
+    """L2 book for one token"""
+
+    def __init__(self, token_id: str):
+        self.token_id = token_id
+        self.bids = BookSide(is_bid=True)
+        self.asks = BookSide(is_bid=False)
+        self.last_seq: Optional[int] = None
+        self.last_hash: Optional[str] = None
+        self.updated_at: Optional[float] = None  # time.monotonic()
+        self.valid = False  # False until a snapshot arrives (or after a gap)
+
+    def apply_snapshot(self, bids: Iterable[Dict], asks: Iterable[Dict], seq: Optional[int] = None):
+        """Replace the book from a full snapshot"""
+        self.bids.load(bids)
+        self.asks.load(asks)
+        self.last_seq = seq
+        self.valid = True
+        self.updated_at = time.monotonic()
+
+    def apply_delta(self, side: str, price, size):
+        """Apply one level change (side BUY = bids, SELL = asks)"""
+        book_side = self.bids if side.upper() in ('BUY', 'BID', 'BIDS') else self.asks
+        book_side.set(price_to_ticks(price), float(size))
+        self.updated_at = time.monotonic()
+
+    def best_bid(self) -> Optional[Tuple[float, float]]:
+        """(price, size) of the best bid"""
+        tick = self.bids.best()
+        return (ticks_to_price(tick), self.bids.levels[tick]) if tick is not None else None
+
+    def best_ask(self) -> Optional[Tuple[float, float]]:
+        """(price, size) of the best ask"""
+        tick = self.asks.best()
+        return (ticks_to_price(tick), self.asks.levels[tick]) if tick is not None else None
+
+    def spread_ticks(self) -> Optional[int]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask - bid
+
+    def mid(self) -> Optional[float]:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid + ask) / 2 / TICKS_PER_UNIT
+
+    def depth_at(self, side: str, price) -> float:
+        """Resting size at an exact price"""
+        book_side = self.bids if side.upper() in ('BUY', 'BID', 'BIDS') else self.asks
+        return book_side.size_at(price_to_ticks(price))
+
+    def age(self) -> Optional[float]:
+        """Seconds since the last update"""
+        if self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    def to_dict(self) -> Dict:
+        """REST-style {'bids': [...], 'asks': [...]} with best levels first"""
+        return {
+            'asset_id': self.token_id,
+            'bids': [
+                {'price': str(ticks_to_price(t)), 'size': str(s)}
+                for t, s in self.bids.levels_from_best()
+            ],
+            'asks': [
+                {'price': str(ticks_to_price(t)), 'size': str(s)}
+                for t, s in self.asks.levels_from_best()
+            ],
+        }
+
+
+class OrderBookManager:
+    """
+    Keeps an OrderBook per token from WebSocket book/price_change events
+    and resyncs a book over REST when a sequence gap is detected.
+    """
+
+    def __init__(self, clob_api: Optional[ClobAPI] = None):
+        self.clob_api = clob_api or ClobAPI()
+        self.books: Dict[str, OrderBook] = {}
+        self.listeners: List[Callable] = []  # called with (token_id, book)
+        self.gaps = 0
+        self._resyncs: Dict[str, asyncio.Task] = {}
+
+    def get_book(self, token_id: str) -> Optional[OrderBook]:
+        book = self.books.get(token_id)
+        return book if book is not None and book.valid else None
+
+    def add_listener(self, callback: Callable):
+        """
+        Register a callback fired with (token_id, book) on every change,
+        including invalidation (book.valid False until the resync lands)
+        """
+        self.listeners.append(callback)
+
+    def attach(self, feed):
+        """Consume a WebSocketBookFeed's messages"""
+        feed.on_message = self.handle_message
+
+    async def consume(self, subscription):
+        """
+        Apply messages from a feed consumer queue; books whose deltas the
+        queue dropped are invalidated and reloaded over REST
+        """
+        async for message in subscription:
+            self.handle_message(message)
+            for token_id in subscription.take_stale():
+                self.invalidate(token_id)
+    
+    def invalidate(self, token_id: str):
+        """
+        Mark a book unusable until a fresh snapshot arrives; listeners
+        are told so cached state derived from it can be dropped
+        """
+        book = self.books.get(token_id)
+        if book is not None:
+            book.valid = False
+            book.last_seq = None
+        self._schedule_resync(token_id)
+        if book is not None:
+            self._notify(token_id, book)
+    
+    def handle_message(self, data):
+        """Apply one decoded feed message (a single event or a list)"""
+        events = data if isinstance(data, list) else [data]
+        for event in events:
+            event_type = event.get('event_type') or event.get('type')
+            if event_type == 'book':
+                self._on_snapshot(event)
+            elif event_type == 'price_change':
+                self._on_price_change(event)
+
+    def _book(self, token_id: str) -> OrderBook:
+        book = self.books.get(token_id)
+        if book is None:
+            book = self.books[token_id] = OrderBook(token_id)
+        return book
+
+    def _on_snapshot(self, event: Dict):
+        token_id = event.get('asset_id')
+        if not token_id:
+            return
+        book = self._book(token_id)
+        book.apply_snapshot(event.get('bids', []), event.get('asks', []), self._seq(event))
+        book.last_hash = event.get('hash')
+        self._notify(token_id, book)
+
+    def _on_price_change(self, event: Dict):
+        # Newer format: price_changes[] each with its own asset_id
+        # Older format: asset_id + changes[]
+        changes = event.get('price_changes')
+        if changes is None:
+            changes = [dict(c, asset_id=event.get('asset_id')) for c in event.get('changes', [])]
+
+        touched: Dict[str, OrderBook] = {}
+        seq = self._seq(event)
+        for change in changes:
+            token_id = change.get('asset_id')
+            if not token_id:
+                continue
+            book = self._book(token_id)
+            if token_id not in touched and not self._check_seq(book, seq):
+                continue
+            if not book.valid:
+                continue
+            book.apply_delta(change.get('side', ''), change['price'], change['size'])
+            if change.get('hash'):
+                book.last_hash = change['hash']
+            touched[token_id] = book
+
+        for token_id, book in touched.items():
+            self._notify(token_id, book)
+
+    @staticmethod
+    def _seq(event: Dict) -> Optional[int]:
+        seq = event.get('seq', event.get('sequence'))
+        return int(seq) if seq is not None else None
+
+    def _check_seq(self, book: OrderBook, seq: Optional[int]) -> bool:
+        """Advance the book's sequence; on a gap invalidate and resync"""
+        if seq is None:
+            return True
+        if book.last_seq is not None and seq != book.last_seq + 1:
+            self.gaps += 1
+            print(f"Book gap on {book.token_id}: {book.last_seq} -> {seq}, resyncing")
+            self.invalidate(book.token_id)
+            return False
+        book.last_seq = seq
+        return True
+
+    def _schedule_resync(self, token_id: str):
+        task = self._resyncs.get(token_id)
+        if task is None or task.done():
+            self._resyncs[token_id] = asyncio.ensure_future(self.resync(token_id))
+
+    async def resync(self, token_id: str):
+        """Reload a book from the REST snapshot"""
+        try:
+            snapshot = await self.clob_api.get_order_book(token_id)
+        except Exception as e:
+            print(f"Book resync failed for {token_id}: {e}")
+            return
+        if snapshot:
+            self.apply_rest_snapshot(token_id, snapshot)
+
+    def apply_rest_snapshot(self, token_id: str, snapshot: Dict):
+        """Load a `/book` REST response into the local book"""
+        self._on_snapshot(dict(snapshot, asset_id=token_id))
+
+    def _notify(self, token_id: str, book: OrderBook):
+        for callback in self.listeners:
+            try:
+                callback(token_id, book)
+            except Exception as e:
+                print(f"Book listener error: {e}")
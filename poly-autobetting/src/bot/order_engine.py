@@ -2,68 +2,147 @@
 Order Engine - Handles order placement and management
 """
 from decimal import Decimal
-from typing import Dict, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 import asyncio
+import time
 
 from src.bot.client import ClobClientWrapper
+from src.bot.fixed_point import (
+    micros_to_decimal,
+    price_to_ticks,
+    ticks_to_decimal,
+    to_micros,
+)
 from src.bot.types import OrderSide, OrderType
 
 
 class OrderEngine:
     """Handles order placement for a specific timeframe"""
     
-    def __init__(self, client: ClobClientWrapper, buy_price: Decimal, timeframe_name: str):
+    def __init__(
+        self,
+        client: ClobClientWrapper,
+        buy_price: Decimal,
+        timeframe_name: str,
+        use_batch_post: bool = False
+    ):
         """
         Args:
             client: CLOB client wrapper
             buy_price: Price to buy at (e.g., 0.48 for 48c)
             timeframe_name: Name for logging (5min, 15min)
+            use_batch_post: Post both legs in one multi-order request
         """
         self.client = client
-        self.buy_price = buy_price
+        self.buy_price_ticks = price_to_ticks(buy_price)
+        self.buy_price = ticks_to_decimal(self.buy_price_ticks)  # exact, for order payloads
         self.timeframe_name = timeframe_name
-        self.min_order_size = Decimal('1.0')  # $1 minimum
+        self.use_batch_post = use_batch_post
+        self.min_order_size_micros = to_micros(1)  # $1 minimum
+        
+        # Per-leg timing of the last dual placement
+        self.last_leg_timings: List[Dict] = []
+        self.last_leg_skew_ms: Optional[float] = None
         
-    async def place_dual_orders(self, market: dict) -> bool:
+    async def place_dual_orders(self, market: dict) -> List[Optional[Dict]]:
         """
         Place limit buy orders on both UP and DOWN outcomes
         
-        Returns True if both orders were placed successfully
+        Returns:
+            The order for each leg (UP, DOWN), None where the leg failed
         """
         condition_id = market['condition_id']
         outcomes = market.get('outcomes', ['UP', 'DOWN'])
         
         if len(outcomes) < 2:
             print(f"[{self.timeframe_name}] Market missing outcomes: {condition_id}")
-            return False
+            return []
         
         # Calculate order size (can be adjusted based on available balance)
-        order_size = self._calculate_order_size(market)
+        size_micros = self.order_size_micros(market)
+        order_size = micros_to_decimal(size_micros)
         
         print(f"[{self.timeframe_name}] Placing orders on {market.get('description', condition_id)[:50]}...")
         
-        # Place orders on both sides
-        orders_placed = []
+        # Place both sides concurrently so neither leg waits on the other
+        legs = list(enumerate(outcomes[:2]))  # Only first 2 outcomes
+        started = time.perf_counter()
+        
+        if self.use_batch_post:
+            orders = await self._place_batch(condition_id, order_size)
+            finished = [time.perf_counter()] * len(legs)
+        else:
+            timed = await asyncio.gather(*[
+                self._timed_limit_buy(condition_id, i, order_size) for i, _ in legs
+            ])
+            orders = [order for order, _ in timed]
+            finished = [t for _, t in timed]
+        
+        self._record_leg_timings(legs, orders, started, finished)
         
-        for i, outcome in enumerate(outcomes[:2]):  # Only first 2 outcomes
-            try:
-                order = await self._place_limit_buy(
-                    condition_id=condition_id,
-                    outcome_index=i,
-                    price=self.buy_price,
-                    size=order_size
-                )
-                
-                if order:
-                    orders_placed.append(order)
-                    print(f"  ✓ {outcome}: {self.buy_price} x {order_size}")
-                else:
-                    print(f"  ✗ {outcome}: Failed to place")
-                    
-            except Exception as e:
-                print(f"  ✗ {outcome}: {e}")
+        for (i, outcome), order in zip(legs, orders):
+            if order:
+                print(f"  ✓ {outcome}: {self.buy_price} x {order_size}")
+            else:
+                print(f"  ✗ {outcome}: Failed to place")
+        
+        if self.last_leg_skew_ms is not None:
+            print(f"  ⏱ leg skew: {self.last_leg_skew_ms:.1f}ms")
+        
+        return list(orders)
+    
+    async def _timed_limit_buy(
+        self,
+        condition_id: str,
+        outcome_index: int,
+        size: Decimal
+    ) -> Tuple[Optional[Dict], float]:
+        """Place one leg and return it with its completion time"""
+        order = await self._place_limit_buy(
+            condition_id=condition_id,
+            outcome_index=outcome_index,
+            price=self.buy_price,
+            size=size
+        )
+        return order, time.perf_counter()
+    
+    async def _place_batch(self, condition_id: str, size: Decimal) -> List[Optional[Dict]]:
+        """Sign both legs concurrently and post them in a single request"""
+        try:
+            return await self.client.place_orders([
+                {
+                    'condition_id': condition_id,
+                    'outcome_index': i,
+                    'side': OrderSide.BUY,
+                    'price': self.buy_price,
+                    'size': size
+                }
+                for i in range(2)
+            ])
+        except Exception as e:
+            print(f"Batch order placement error: {e}")
+            return [None, None]
+    
+    def _record_leg_timings(
+        self,
+        legs: List[Tuple[int, str]],
+        orders: List[Optional[Dict]],
+        started: float,
+        finished: List[float]
+    ):
+        """Keep per-leg latency and the skew between legs"""
+        self.last_leg_timings = [
+            {
+                'outcome_index': i,
+                'outcome': outcome,
+                'placed': order is not None,
+                'elapsed_ms': (done - started) * 1000
+            }
+            for (i, outcome), order, done in zip(legs, orders, finished)
+        ]
         
-        return len(orders_placed) == 2
+        placed = [t['elapsed_ms'] for t in self.last_leg_timings if t['placed']]
+        self.last_leg_skew_ms = max(placed) - min(placed) if len(placed) == 2 else None
     
     async def _place_limit_buy(
         self,
@@ -87,10 +166,10 @@ class OrderEngine:
             print(f"Order placement error: {e}")
             return None
     
-    def _calculate_order_size(self, market: dict) -> Decimal:
-        """Calculate appropriate order size for the market"""
+    def order_size_micros(self, market: dict) -> int:
+        """Calculate appropriate order size (micro-shares) for the market"""
         # Start with minimum size
-        size = self.min_order_size
+        size = self.min_order_size_micros
         
         # Could add logic here to scale based on:
         # - Available balance
@@ -1,65 +1,138 @@
 """
 Position Tracker - Tracks open positions and P&L per timeframe
 """
+from collections import OrderedDict
 from decimal import Decimal
 from typing import Dict, List, Optional
 from dataclasses import dataclass, field
-from datetime import datetime
+from datetime import datetime, timezone
 import json
 import os
 
+from src.bot.event_log import EventLog, read_events, write_snapshot
+from src.bot.fixed_point import cost_micros, micros_to_decimal, micros_to_float, price_to_ticks, to_micros
+
+
+FILL_CURSOR_OVERLAP = 60  # seconds re-read behind the cursor; trade ids dedup the overlap
+MAX_SEEN_TRADES = 2000
+
 
 @dataclass
 class Position:
-    """Represents an open or closed position"""
+    """Represents an open or closed position (amounts in integer micro-units)"""
     condition_id: str
     market_description: str
     timeframe: str  # "5min" or "15min"
     up_filled: bool = False
     down_filled: bool = False
-    up_cost: Decimal = Decimal('0')
-    down_cost: Decimal = Decimal('0')
-    up_size: Decimal = Decimal('0')
-    down_size: Decimal = Decimal('0')
+    up_cost_micros: int = 0
+    down_cost_micros: int = 0
+    up_size_micros: int = 0
+    down_size_micros: int = 0
     opened_at: Optional[datetime] = None
     closed_at: Optional[datetime] = None
     redeemed: bool = False
-    redeem_amount: Decimal = Decimal('0')
+    redeem_micros: int = 0
     
     @property
     def is_fully_filled(self) -> bool:
         return self.up_filled and self.down_filled
     
     @property
-    def total_cost(self) -> Decimal:
-        return self.up_cost + self.down_cost
+    def total_cost_micros(self) -> int:
+        return self.up_cost_micros + self.down_cost_micros
     
     @property
-    def expected_payout(self) -> Decimal:
+    def expected_payout_micros(self) -> int:
         # Winner gets $1 per share
         if self.up_filled:
-            return self.up_size
+            return self.up_size_micros
         if self.down_filled:
-            return self.down_size
-        return Decimal('0')
+            return self.down_size_micros
+        return 0
+    
+    # Decimal views for reporting
+    @property
+    def up_cost(self) -> Decimal:
+        return micros_to_decimal(self.up_cost_micros)
+    
+    @property
+    def down_cost(self) -> Decimal:
+        return micros_to_decimal(self.down_cost_micros)
+    
+    @property
+    def up_size(self) -> Decimal:
+        return micros_to_decimal(self.up_size_micros)
+    
+    @property
+    def down_size(self) -> Decimal:
+        return micros_to_decimal(self.down_size_micros)
+    
+    @property
+    def redeem_amount(self) -> Decimal:
+        return micros_to_decimal(self.redeem_micros)
+    
+    @property
+    def total_cost(self) -> Decimal:
+        return micros_to_decimal(self.total_cost_micros)
+    
+    @property
+    def expected_payout(self) -> Decimal:
+        return micros_to_decimal(self.expected_payout_micros)
     
     @property
     def potential_profit(self) -> Decimal:
-        return self.expected_payout - self.total_cost
+        return micros_to_decimal(self.expected_payout_micros - self.total_cost_micros)
 
 
 class PositionTracker:
     """Tracks positions for a specific timeframe"""
     
-    def __init__(self, timeframe_name: str, state_file: Optional[str] = None):
+    def __init__(
+        self,
+        timeframe_name: str,
+        state_file: Optional[str] = None,
+        persist: bool = True,
+        snapshot_every: int = 500
+    ):
+        """
+        Args:
+            timeframe_name: Name for logging (5min, 15min)
+            state_file: Snapshot file; events go to a .log next to it
+            persist: False keeps state in memory only (backtests)
+            snapshot_every: Compact the log into a snapshot after this many events
+        """
         self.timeframe_name = timeframe_name
         self.positions: Dict[str, Position] = {}  # condition_id -> Position
         self.open_positions: Dict[str, Position] = {}
         self.closed_positions: List[Position] = []
         
-        # State persistence
+        # Incremental fill ingestion
+        self.fill_cursor = 0  # match_time of the newest trade seen
+        self.seen_trades: OrderedDict = OrderedDict()  # trade_id -> match_time (None once reversed)
+        self.pending_trades: OrderedDict = OrderedDict()  # trade_id -> fill awaiting its position
+        
+        # State persistence: snapshot + append-only event log
+        self.persist = persist
         self.state_file = state_file or f"positions_{timeframe_name}.json"
-        self.load_state()
+        self.snapshot_every = snapshot_every
+        self.log: Optional[EventLog] = None
+        self._events_since_snapshot = 0
+        if self.persist:
+            self.log = EventLog(self.log_file)
+            self.load_state()
+    
+    @property
+    def log_file(self) -> str:
+        return os.path.splitext(self.state_file)[0] + '.log'
+    
+    @classmethod
+    def read_only(cls, state_file: str, timeframe_name: str = '') -> 'PositionTracker':
+        """Snapshot plus log tail, without touching either file (analysis)"""
+        tracker = cls(timeframe_name or os.path.basename(state_file), state_file=state_file, persist=False)
+        log_seq = tracker._load_snapshot()
+        tracker._replay(read_events(tracker.log_file, after_seq=log_seq))
+        return tracker
     
     def has_position(self, condition_id: str) -> bool:
         """Check if we have an active position for this market"""
@@ -70,15 +143,13 @@ class PositionTracker:
         condition_id = market['condition_id']
         
         if condition_id not in self.positions:
-            self.positions[condition_id] = Position(
-                condition_id=condition_id,
-                market_description=market.get('description', 'Unknown'),
-                timeframe=self.timeframe_name,
-                opened_at=datetime.utcnow()
-            )
-            self.open_positions[condition_id] = self.positions[condition_id]
-        
-        self.save_state()
+            self._record({
+                'op': 'open',
+                'condition_id': condition_id,
+                'description': market.get('description', 'Unknown'),
+                'opened_at': datetime.utcnow().isoformat(),
+            })
+            self._apply_pending(condition_id)
     
     def record_fill(self, condition_id: str, outcome_index: int, price: Decimal, size: Decimal):
         """Record a fill for one side of a position"""
@@ -86,40 +157,222 @@ class PositionTracker:
             return
         
         pos = self.positions[condition_id]
-        cost = price * size
-        
-        if outcome_index == 0:  # UP
-            pos.up_filled = True
-            pos.up_cost = cost
-            pos.up_size = size
-        else:  # DOWN
-            pos.down_filled = True
-            pos.down_cost = cost
-            pos.down_size = size
+        self._record({
+            'op': 'fill',
+            'condition_id': condition_id,
+            'outcome_index': outcome_index,
+            'price': str(price),
+            'size': str(size),
+        })
         
         # If both sides filled, we can calculate expected profit
         if pos.is_fully_filled:
             print(f"[{self.timeframe_name}] Both sides filled for {condition_id}")
             print(f"  Cost: ${pos.total_cost:.2f}, Expected payout: $1.00")
             print(f"  Profit: ${pos.potential_profit:.2f}")
+    
+    def _record(self, event: Dict):
+        """Apply an event and append it to the log"""
+        self._apply(event)
+        if self.log is None:
+            return
+        self.log.append(event)
+        self._events_since_snapshot += 1
+        if self._events_since_snapshot >= self.snapshot_every:
+            self.save_state()
+    
+    def _apply(self, event: Dict):
+        """Mutate state for one event (live or replayed)"""
+        op = event['op']
+        condition_id = event['condition_id']
         
-        self.save_state()
+        if op == 'open':
+            if condition_id not in self.positions:
+                pos = Position(
+                    condition_id=condition_id,
+                    market_description=event.get('description', 'Unknown'),
+                    timeframe=self.timeframe_name,
+                    opened_at=datetime.fromisoformat(event['opened_at']) if event.get('opened_at') else None
+                )
+                self.positions[condition_id] = pos
+                self.open_positions[condition_id] = pos
+            return
+        
+        pos = self.positions.get(condition_id)
+        if pos is None:
+            return
+        
+        if op == 'trade':
+            self.pending_trades.pop(event['trade_id'], None)
+            self._mark_seen(event['trade_id'], event.get('match_time', 0))
+            size = to_micros(event['size'])
+            cost = cost_micros(price_to_ticks(event['price']), size)
+            if event['outcome_index'] == 0:  # UP
+                pos.up_filled = True
+                pos.up_cost_micros += cost
+                pos.up_size_micros += size
+            else:  # DOWN
+                pos.down_filled = True
+                pos.down_cost_micros += cost
+                pos.down_size_micros += size
+        elif op == 'fill':
+            size = to_micros(event['size'])
+            cost = cost_micros(price_to_ticks(event['price']), size)
+            if event['outcome_index'] == 0:  # UP
+                pos.up_filled = True
+                pos.up_cost_micros = cost
+                pos.up_size_micros = size
+            else:  # DOWN
+                pos.down_filled = True
+                pos.down_cost_micros = cost
+                pos.down_size_micros = size
+        elif op == 'reverse':
+            # A matched trade that later FAILED on-chain
+            self.seen_trades[event['trade_id']] = None
+            size = to_micros(event['size'])
+            cost = cost_micros(price_to_ticks(event['price']), size)
+            if event['outcome_index'] == 0:  # UP
+                pos.up_cost_micros = max(0, pos.up_cost_micros - cost)
+                pos.up_size_micros = max(0, pos.up_size_micros - size)
+                pos.up_filled = pos.up_size_micros > 0
+            else:  # DOWN
+                pos.down_cost_micros = max(0, pos.down_cost_micros - cost)
+                pos.down_size_micros = max(0, pos.down_size_micros - size)
+                pos.down_filled = pos.down_size_micros > 0
+        elif op == 'discard':
+            if not (pos.up_filled or pos.down_filled):
+                del self.positions[condition_id]
+                self.open_positions.pop(condition_id, None)
+        elif op == 'redeem':
+            pos.redeemed = True
+            pos.redeem_micros = to_micros(event['amount'])
+            pos.closed_at = datetime.fromisoformat(event['closed_at'])
+            
+            # Move to closed
+            if condition_id in self.open_positions:
+                del self.open_positions[condition_id]
+                self.closed_positions.append(pos)
     
-    async def update_positions(self, client):
-        """Update position status from on-chain data"""
-        # Query CLOB for fills
-        for condition_id in list(self.open_positions.keys()):
-            try:
-                fills = await client.get_fills(condition_id)
-                for fill in fills:
-                    self.record_fill(
-                        condition_id=condition_id,
-                        outcome_index=fill['outcome_index'],
-                        price=Decimal(str(fill['price'])),
-                        size=Decimal(str(fill['size']))
-                    )
-            except Exception as e:
-                print(f"Error updating position {condition_id}: {e}")
+    def record_trade(self, fill: Dict) -> bool:
+        """
+        Add one trade to its position (idempotent by trade_id)
+        
+        Unlike record_fill, trades accumulate: each one adds its size and cost.
+        A FAILED status reverses a trade already applied. Trades for markets
+        with no position yet are held until the position is opened.
+        Returns True if the trade was new and applied (or reversed).
+        """
+        trade_id = fill['trade_id']
+        if fill.get('status') == 'FAILED':
+            return self._reverse_trade(fill)
+        if trade_id in self.seen_trades:
+            return False
+        
+        condition_id = fill['condition_id']
+        if fill.get('side', 'BUY') != 'BUY':
+            self._mark_seen(trade_id, fill.get('match_time', 0))
+            return False
+        
+        pos = self.positions.get(condition_id)
+        if pos is None:
+            self._hold_pending(fill)
+            return False
+        
+        was_filled = pos.is_fully_filled
+        self._record({
+            'op': 'trade',
+            'condition_id': condition_id,
+            'trade_id': trade_id,
+            'outcome_index': fill['outcome_index'],
+            'price': str(fill['price']),
+            'size': str(fill['size']),
+            'match_time': fill.get('match_time', 0),
+        })
+        
+        if pos.is_fully_filled and not was_filled:
+            print(f"[{self.timeframe_name}] Both sides filled for {condition_id}")
+            print(f"  Cost: ${pos.total_cost:.2f}, Expected payout: $1.00")
+            print(f"  Profit: ${pos.potential_profit:.2f}")
+        return True
+    
+    def _reverse_trade(self, fill: Dict) -> bool:
+        trade_id = fill['trade_id']
+        self.pending_trades.pop(trade_id, None)
+        if trade_id not in self.seen_trades:
+            # Never applied: remember it so a stale MATCHED copy is ignored
+            self._mark_seen(trade_id, fill.get('match_time', 0))
+            return False
+        if self.seen_trades[trade_id] is None or fill.get('side', 'BUY') != 'BUY':
+            return False
+        if fill['condition_id'] not in self.positions:
+            return False
+        
+        self._record({
+            'op': 'reverse',
+            'condition_id': fill['condition_id'],
+            'trade_id': trade_id,
+            'outcome_index': fill['outcome_index'],
+            'price': str(fill['price']),
+            'size': str(fill['size']),
+        })
+        print(f"[{self.timeframe_name}] Reversed failed trade {trade_id} on {fill['condition_id']}")
+        return True
+    
+    def _hold_pending(self, fill: Dict):
+        """Keep a trade whose position isn't open yet; the cursor still advances"""
+        self.pending_trades[fill['trade_id']] = fill
+        self.fill_cursor = max(self.fill_cursor, fill.get('match_time', 0))
+        while len(self.pending_trades) > MAX_SEEN_TRADES:
+            self.pending_trades.popitem(last=False)
+    
+    def _apply_pending(self, condition_id: str):
+        held = [f for f in self.pending_trades.values() if f['condition_id'] == condition_id]
+        for fill in sorted(held, key=lambda f: f.get('match_time', 0)):
+            self.pending_trades.pop(fill['trade_id'], None)
+            self.record_trade(fill)
+    
+    def discard_position(self, condition_id: str):
+        """Drop a placeholder position whose orders never went out (no fills)"""
+        pos = self.positions.get(condition_id)
+        if pos is not None and not (pos.up_filled or pos.down_filled):
+            self._record({'op': 'discard', 'condition_id': condition_id})
+    
+    def _mark_seen(self, trade_id: str, match_time: int):
+        self.seen_trades[trade_id] = match_time
+        self.fill_cursor = max(self.fill_cursor, match_time)
+        while len(self.seen_trades) > MAX_SEEN_TRADES:
+            self.seen_trades.popitem(last=False)
+    
+    async def update_positions(self, client) -> int:
+        """Apply fills since the cursor with one trades query per cycle; returns fills applied"""
+        if not self.open_positions:
+            return 0
+        
+        if self.fill_cursor:
+            after = self.fill_cursor - FILL_CURSOR_OVERLAP
+        else:
+            # First run: nothing we hold can have filled before it opened
+            opened = [p.opened_at for p in self.open_positions.values() if p.opened_at]
+            after = int(min(opened).replace(tzinfo=timezone.utc).timestamp()) - FILL_CURSOR_OVERLAP if opened else None
+        
+        try:
+            fills = await client.get_trades_since(after)
+        except Exception as e:
+            print(f"Error fetching fills: {e}")
+            return 0
+        
+        by_condition: Dict[str, List[Dict]] = {}
+        for fill in fills:
+            by_condition.setdefault(fill['condition_id'], []).append(fill)
+        
+        applied = 0
+        for condition_id, market_fills in by_condition.items():
+            for fill in sorted(market_fills, key=lambda f: f.get('match_time', 0)):
+                applied += self.record_trade(fill)
+        
+        if applied:
+            print(f"[{self.timeframe_name}] Applied {applied} new fills")
+        return applied
     
     async def get_resolved_positions(self) -> List[Position]:
         """Get positions that have been resolved and need redeeming"""
@@ -133,105 +386,143 @@ class PositionTracker:
     
     def record_redeem(self, position: Position, amount: Decimal = Decimal('1.0')):
         """Record that a position was redeemed"""
-        position.redeemed = True
-        position.redeem_amount = amount
-        position.closed_at = datetime.utcnow()
-        
-        # Move to closed
-        if position.condition_id in self.open_positions:
-            del self.open_positions[position.condition_id]
-            self.closed_positions.append(position)
-        
-        self.save_state()
+        self._record({
+            'op': 'redeem',
+            'condition_id': position.condition_id,
+            'amount': str(amount),
+            'closed_at': datetime.utcnow().isoformat(),
+        })
     
     def calculate_pnl(self, position: Position) -> Decimal:
         """Calculate realized P&L for a position"""
+        return micros_to_decimal(self.calculate_pnl_micros(position))
+    
+    @staticmethod
+    def calculate_pnl_micros(position: Position) -> int:
         if not position.redeemed:
-            return Decimal('0')
-        return position.redeem_amount - position.total_cost
+            return 0
+        return position.redeem_micros - position.total_cost_micros
     
     def get_stats(self) -> Dict:
         """Get P&L statistics for this timeframe"""
         total_profit = sum(
-            self.calculate_pnl(p) for p in self.closed_positions
+            self.calculate_pnl_micros(p) for p in self.closed_positions
         )
         
         open_cost = sum(
-            p.total_cost for p in self.open_positions.values()
+            p.total_cost_micros for p in self.open_positions.values()
         )
         
         return {
             'timeframe': self.timeframe_name,
             'open_positions': len(self.open_positions),
             'closed_positions': len(self.closed_positions),
-            'realized_pnl': float(total_profit),
-            'open_exposure': float(open_cost),
+            'realized_pnl': micros_to_float(total_profit),
+            'open_exposure': micros_to_float(open_cost),
         }
     
     def save_state(self):
-        """Persist positions to disk"""
+        """Compact state into an atomic snapshot and empty the event log"""
+        if not self.persist:
+            return
         try:
-            data = {
-                'positions': [
-                    {
-                        'condition_id': p.condition_id,
-                        'market_description': p.market_description,
-                        'timeframe': p.timeframe,
-                        'up_filled': p.up_filled,
-                        'down_filled': p.down_filled,
-                        'up_cost': float(p.up_cost),
-                        'down_cost': float(p.down_cost),
-                        'up_size': float(p.up_size),
-                        'down_size': float(p.down_size),
-                        'opened_at': p.opened_at.isoformat() if p.opened_at else None,
-                        'closed_at': p.closed_at.isoformat() if p.closed_at else None,
-                        'redeemed': p.redeemed,
-                        'redeem_amount': float(p.redeem_amount),
-                    }
-                    for p in self.positions.values()
-                ]
-            }
-            
-            with open(self.state_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            write_snapshot(self.state_file, {
+                'log_seq': self.log.seq if self.log else 0,
+                'fill_cursor': self.fill_cursor,
+                'seen_trades': list(self.seen_trades.items()),
+                'pending_trades': list(self.pending_trades.values()),
+                'positions': [self._position_to_dict(p) for p in self.positions.values()]
+            })
+            if self.log:
+                self.log.reset()
+            self._events_since_snapshot = 0
         except Exception as e:
             print(f"Failed to save state: {e}")
     
     def load_state(self):
-        """Load positions from disk"""
-        if not os.path.exists(self.state_file):
+        """Load the last snapshot, then replay the event log tail"""
+        log_seq = self._load_snapshot()
+        if self.log is None:
             return
-        
-        try:
-            with open(self.state_file, 'r') as f:
-                data = json.load(f)
-            
-            for p_data in data.get('positions', []):
-                pos = Position(
-                    condition_id=p_data['condition_id'],
-                    market_description=p_data['market_description'],
-                    timeframe=p_data['timeframe'],
-                    up_filled=p_data.get('up_filled', False),
-                    down_filled=p_data.get('down_filled', False),
-                    up_cost=Decimal(str(p_data.get('up_cost', 0))),
-                    down_cost=Decimal(str(p_data.get('down_cost', 0))),
-                    up_size=Decimal(str(p_data.get('up_size', 0))),
-                    down_size=Decimal(str(p_data.get('down_size', 0))),
-                    redeemed=p_data.get('redeemed', False),
-                    redeem_amount=Decimal(str(p_data.get('redeem_amount', 0))),
-                )
-                
-                if p_data.get('opened_at'):
-                    pos.opened_at = datetime.fromisoformat(p_data['opened_at'])
-                if p_data.get('closed_at'):
-                    pos.closed_at = datetime.fromisoformat(p_data['closed_at'])
-                
-                self.positions[pos.condition_id] = pos
-                
-                if not pos.redeemed:
-                    self.open_positions[pos.condition_id] = pos
-                else:
-                    self.closed_positions.append(pos)
-                    
-        except Exception as e:
-            print(f"Failed to load state: {e}")
+        self.log.seq = max(self.log.seq, log_seq)
+        self._events_since_snapshot = self._replay(self.log.replay(after_seq=log_seq))
+    
+    def _load_snapshot(self) -> int:
+        """Load the snapshot file; returns the log seq it covers"""
+        log_seq = 0
+        if os.path.exists(self.state_file):
+            try:
+                with open(self.state_file, 'r') as f:
+                    data = json.load(f)
+                log_seq = data.get('log_seq', 0)
+                self.fill_cursor = data.get('fill_cursor', 0)
+                self.seen_trades = OrderedDict((t, ts) for t, ts in data.get('seen_trades', []))
+                self.pending_trades = OrderedDict((f['trade_id'], f) for f in data.get('pending_trades', []))
+                for p_data in data.get('positions', []):
+                    pos = self._position_from_dict(p_data)
+                    self.positions[pos.condition_id] = pos
+                    if not pos.redeemed:
+                        self.open_positions[pos.condition_id] = pos
+                    else:
+                        self.closed_positions.append(pos)
+            except Exception as e:
+                print(f"Failed to load state: {e}")
+        return log_seq
+    
+    def _replay(self, events) -> int:
+        replayed = 0
+        for event in events:
+            try:
+                self._apply(event)
+                replayed += 1
+            except (KeyError, ValueError) as e:
+                print(f"Skipping bad log event {event.get('seq')}: {e}")
+        if replayed:
+            print(f"[{self.timeframe_name}] Replayed {replayed} position events")
+        return replayed
+    
+    def close(self):
+        """Write a final snapshot and close the log"""
+        if self.persist:
+            self.save_state()
+        if self.log:
+            self.log.close()
+    
+    @staticmethod
+    def _position_to_dict(p: Position) -> Dict:
+        return {
+            'condition_id': p.condition_id,
+            'market_description': p.market_description,
+            'timeframe': p.timeframe,
+            'up_filled': p.up_filled,
+            'down_filled': p.down_filled,
+            'up_cost': str(p.up_cost),
+            'down_cost': str(p.down_cost),
+            'up_size': str(p.up_size),
+            'down_size': str(p.down_size),
+            'opened_at': p.opened_at.isoformat() if p.opened_at else None,
+            'closed_at': p.closed_at.isoformat() if p.closed_at else None,
+            'redeemed': p.redeemed,
+            'redeem_amount': str(p.redeem_amount),
+        }
+    
+    @staticmethod
+    def _position_from_dict(p_data: Dict) -> Position:
+        pos = Position(
+            condition_id=p_data['condition_id'],
+            market_description=p_data['market_description'],
+            timeframe=p_data['timeframe'],
+            up_filled=p_data.get('up_filled', False),
+            down_filled=p_data.get('down_filled', False),
+            up_cost_micros=to_micros(p_data.get('up_cost', 0)),
+            down_cost_micros=to_micros(p_data.get('down_cost', 0)),
+            up_size_micros=to_micros(p_data.get('up_size', 0)),
+            down_size_micros=to_micros(p_data.get('down_size', 0)),
+            redeemed=p_data.get('redeemed', False),
+            redeem_micros=to_micros(p_data.get('redeem_amount', 0)),
+        )
+        if p_data.get('opened_at'):
+            pos.opened_at = datetime.fromisoformat(p_data['opened_at'])
+        if p_data.get('closed_at'):
+            pos.closed_at = datetime.fromisoformat(p_data['closed_at'])
+        return pos
@@ -0,0 +1,190 @@
+# Market Data Recorder
+"""
+Record-and-replay of market data to compressed segment files
+"""
+import asyncio
+import gzip
+import os
+import struct
+import time
+import zlib
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, Optional, Tuple
+
+from src.api import codec
+
+
+# Record header: timestamp (float64), channel length (uint16), payload length (uint32)
+_HEADER = struct.Struct('<dHI')
+
+
+class MarketDataRecorder:
+    """
+    Tees raw feed frames and REST responses to append-only segment files.
+
+    Each segment is a gzip stream of length-prefixed records:
+    header | channel (utf-8) | payload. Segments rotate by size and age.
+    """
+
+    def __init__(
+        self,
+        directory: str = "recordings",
+        prefix: str = "market",
+        max_segment_bytes: int = 64 * 1024 * 1024,
+        max_segment_seconds: float = 3600.0,
+        flush_interval: float = 1.0
+    ):
+        """
+        Args:
+            directory: Where segment files go
+            prefix: Segment filename prefix
+            max_segment_bytes: Rotate after this many uncompressed bytes
+            max_segment_seconds: Rotate after this long
+            flush_interval: Seconds between sync flushes (bounds crash loss)
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.prefix = prefix
+        self.max_segment_bytes = max_segment_bytes
+        self.max_segment_seconds = max_segment_seconds
+        self.flush_interval = flush_interval
+
+        self.records = 0
+        self._file: Optional[gzip.GzipFile] = None
+        self._segment_bytes = 0
+        self._segment_opened = 0.0
+        self._last_flush = 0.0
+        self._segment_num = 0
+
+    def record(self, channel: str, payload, ts: Optional[float] = None):
+        """Append one record; `payload` may be bytes, str or a JSON-able object"""
+        if isinstance(payload, str):
+            payload = payload.encode()
+        elif not isinstance(payload, (bytes, bytearray)):
+            payload = codec.dumps(payload).encode()
+
+        now = time.time()
+        if self._file is None or self._should_rotate(now):
+            self._rotate(now)
+
+        channel_bytes = channel.encode()
+        self._file.write(_HEADER.pack(ts if ts is not None else now, len(channel_bytes), len(payload)))
+        self._file.write(channel_bytes)
+        self._file.write(payload)
+
+        self._segment_bytes += _HEADER.size + len(channel_bytes) + len(payload)
+        self.records += 1
+
+        if now - self._last_flush >= self.flush_interval:
+            self._file.flush(zlib.Z_SYNC_FLUSH)
+            self._last_flush = now
+
+    def _should_rotate(self, now: float) -> bool:
+        return (
+            self._segment_bytes >= self.max_segment_bytes
+            or now - self._segment_opened >= self.max_segment_seconds
+        )
+
+    def _rotate(self, now: float):
+        self.close()
+        stamp = datetime.utcfromtimestamp(now).strftime('%Y%m%d-%H%M%S')
+        path = self.directory / f"{self.prefix}-{stamp}-{self._segment_num:05d}.seg.gz"
+        self._segment_num += 1
+        self._file = gzip.open(path, 'ab')
+        self._segment_bytes = 0
+        self._segment_opened = now
+        self._last_flush = now
+
+    def close(self):
+        """Flush and close the current segment"""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class MarketDataReplayer:
+    """Serves recorded segments back to consumers at 1x, Nx or max speed"""
+
+    def __init__(self, directory: str = "recordings", prefix: str = "market"):
+        self.directory = Path(directory)
+        self.prefix = prefix
+
+    def segments(self):
+        """Segment files in recording order"""
+        return sorted(self.directory.glob(f"{self.prefix}-*.seg.gz"))
+
+    def iter_records(self) -> Iterator[Tuple[float, str, bytes]]:
+        """Yield (timestamp, channel, payload) across all segments"""
+        for path in self.segments():
+            yield from self._read_segment(path)
+
+    @staticmethod
+    def _read_segment(path) -> Iterator[Tuple[float, str, bytes]]:
+        try:
+            with gzip.open(path, 'rb') as f:
+                while True:
+                    header = f.read(_HEADER.size)
+                    if len(header) < _HEADER.size:
+                        return
+                    ts, channel_len, payload_len = _HEADER.unpack(header)
+                    channel = f.read(channel_len)
+                    payload = f.read(payload_len)
+                    if len(payload) < payload_len:
+                        return
+                    yield ts, channel.decode(), payload
+        except (EOFError, OSError, zlib.error) as e:
+            # Truncated tail of a segment that was being written at a crash
+            print(f"Replay stopped early in {os.path.basename(path)}: {e}")
+
+    async def replay(
+        self,
+        handlers: Dict[str, Callable],
+        speed: Optional[float] = 1.0
+    ) -> int:
+        """
+        Replay every record through `handlers[channel](ts, payload)`
+
+        Args:
+            handlers: Callback per channel ('ws', 'rest.book', ...)
+            speed: 1.0 = real time, N = N times faster, None/0 = max speed
+
+        Returns number of records replayed
+        """
+        count = 0
+        first_ts = None
+        started = time.monotonic()
+
+        for ts, channel, payload in self.iter_records():
+            if speed:
+                if first_ts is None:
+                    first_ts = ts
+                delay = (ts - first_ts) / speed - (time.monotonic() - started)
+                if delay > 0:
+                    await asyncio.sleep(delay)
+            elif count % 1000 == 0:
+                # Let other tasks run during a max-speed replay
+                await asyncio.sleep(0)
+
+            handler = handlers.get(channel)
+            if handler:
+                handler(ts, payload)
+            count += 1
+
+        return count
+
+    async def replay_into(self, feed=None, book_manager=None, speed: Optional[float] = 1.0) -> int:
+        """
+        Replay into the live components: raw frames go through
+        `feed.dispatch` (on_message + consumers), REST book snapshots into
+        `book_manager`
+        """
+        handlers: Dict[str, Callable] = {}
+        if feed is not None:
+            handlers['ws'] = lambda ts, payload: feed.dispatch(payload)
+        if book_manager is not None:
+            def on_rest_book(ts, payload):
+                record = codec.loads(payload)
+                book_manager.apply_rest_snapshot(record['token_id'], record['book'])
+            handlers['rest.book'] = on_rest_book
+        return await self.replay(handlers, speed)
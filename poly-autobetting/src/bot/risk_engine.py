@@ -2,30 +2,52 @@
 Risk Engine - Risk management and circuit breakers per timeframe
 """
 from decimal import Decimal
-from typing import Dict, Optional
+from typing import Callable, Dict, Optional
 from datetime import datetime, timedelta
 
+from src.bot.fixed_point import micros_to_decimal, micros_to_float, to_micros
+from src.bot.liquidity_model import LiquidityModel
+
 
 class RiskEngine:
     """Manages risk for a specific timeframe"""
     
-    def __init__(self, max_positions: int, timeframe_name: str):
+    def __init__(
+        self,
+        max_positions: int,
+        timeframe_name: str,
+        liquidity: Optional[LiquidityModel] = None,
+        min_fill_probability: float = 0.5,
+        circuit_breaker: bool = True,
+        min_volume: Optional[Decimal] = Decimal('1000'),
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
         """
         Args:
             max_positions: Maximum concurrent positions allowed
             timeframe_name: Name for logging (5min, 15min)
+            liquidity: Book/trade-flow model (falls back to market volume without it)
+            min_fill_probability: Lowest acceptable fill probability per leg
+            circuit_breaker: Enforce the daily loss and consecutive loss limits
+            min_volume: Market volume floor without a model (None disables it)
+            clock: Current UTC time (backtests pass simulated time)
         """
         self.max_positions = max_positions
         self.timeframe_name = timeframe_name
+        self.liquidity = liquidity
+        self.min_fill_probability = min_fill_probability
+        self.circuit_breaker_enabled = circuit_breaker
+        self.min_volume = min_volume
+        self.clock = clock
         
         # Circuit breakers
-        self.daily_loss_limit = Decimal('100.0')  # $100 daily loss limit
+        self.daily_loss_limit_micros = to_micros(100)  # $100 daily loss limit
         self.consecutive_losses_limit = 5
         
         # State
-        self.daily_pnl = Decimal('0')
+        self.daily_pnl_micros = 0
         self.consecutive_losses = 0
-        self.last_reset = datetime.utcnow()
+        self.last_reset = clock()
         self.circuit_breaker_triggered = False
         
     def can_place_order(self, market: dict) -> bool:
@@ -39,17 +61,18 @@ class RiskEngine:
         # Reset daily stats if needed
         self._reset_daily_if_needed()
         
-        # Check daily loss limit
-        if self.daily_pnl < -self.daily_loss_limit:
-            print(f"[{self.timeframe_name}] Daily loss limit reached: ${self.daily_pnl}")
-            self.trigger_circuit_breaker("Daily loss limit")
-            return False
-        
-        # Check consecutive losses
-        if self.consecutive_losses >= self.consecutive_losses_limit:
-            print(f"[{self.timeframe_name}] Consecutive losses limit reached")
-            self.trigger_circuit_breaker("Consecutive losses")
-            return False
+        if self.circuit_breaker_enabled:
+            # Check daily loss limit
+            if self.daily_pnl_micros < -self.daily_loss_limit_micros:
+                print(f"[{self.timeframe_name}] Daily loss limit reached: ${self.daily_pnl}")
+                self.trigger_circuit_breaker("Daily loss limit")
+                return False
+            
+            # Check consecutive losses
+            if self.consecutive_losses >= self.consecutive_losses_limit:
+                print(f"[{self.timeframe_name}] Consecutive losses limit reached")
+                self.trigger_circuit_breaker("Consecutive losses")
+                return False
         
         # Check market liquidity (basic check)
         if not self._has_adequate_liquidity(market):
@@ -59,8 +82,21 @@ class RiskEngine:
     
     def _has_adequate_liquidity(self, market: dict) -> bool:
         """Check if market has enough liquidity"""
-        # Could check order book depth, volume, etc.
-        # For now, basic check on market metadata
+        # Cached book depth and trade flow; a market the model hasn't
+        # seen books and trades for yet waits for a later cycle
+        if self.liquidity is not None:
+            state = self.liquidity.get(market.get('condition_id'))
+            if state is None or not state.ready:
+                return False
+            probability = state.min_fill_probability
+            if probability < self.min_fill_probability:
+                print(f"[{self.timeframe_name}] Low fill probability: {probability:.0%}")
+                return False
+            return True
+        
+        # Without a model, basic check on market metadata
+        if self.min_volume is None:
+            return True
         volume = market.get('volume', '0')
         if isinstance(volume, str):
             try:
@@ -68,16 +104,20 @@ class RiskEngine:
             except:
                 volume = Decimal('0')
         
-        min_volume = Decimal('1000')  # $1000 minimum volume
-        if volume < min_volume:
+        if volume < self.min_volume:
             print(f"[{self.timeframe_name}] Insufficient volume: ${volume}")
             return False
         
         return True
     
+    @property
+    def daily_pnl(self) -> Decimal:
+        return micros_to_decimal(self.daily_pnl_micros)
+    
     def record_result(self, profit: Decimal):
         """Record trade result for risk tracking"""
-        self.daily_pnl += profit
+        profit = to_micros(profit)
+        self.daily_pnl_micros += profit
         
         if profit < 0:
             self.consecutive_losses += 1
@@ -98,9 +138,9 @@ class RiskEngine:
     
     def _reset_daily_if_needed(self):
         """Reset daily stats if it's a new day"""
-        now = datetime.utcnow()
+        now = self.clock()
         if now.date() > self.last_reset.date():
-            self.daily_pnl = Decimal('0')
+            self.daily_pnl_micros = 0
             self.last_reset = now
             print(f"[{self.timeframe_name}] Daily stats reset")
     
@@ -108,7 +148,7 @@ class RiskEngine:
         """Get current risk status"""
         return {
             'timeframe': self.timeframe_name,
-            'daily_pnl': float(self.daily_pnl),
+            'daily_pnl': micros_to_float(self.daily_pnl_micros),
             'consecutive_losses': self.consecutive_losses,
             'circuit_breaker': self.circuit_breaker_triggered,
             'can_trade': not self.circuit_breaker_triggered
@@ -0,0 +1,418 @@
+# Simulator
+"""
+Event-driven order book backtest simulator
+"""
+import asyncio
+import contextlib
+import itertools
+import os
+from dataclasses import dataclass
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from src.api import codec
+from src.api.codec import TICKS_PER_UNIT
+from src.bot.backtest import BacktestResult, sharpe_ratio
+from src.bot.fixed_point import price_to_ticks
+from src.bot.order_book import OrderBook
+from src.bot.order_engine import OrderEngine
+from src.bot.position_tracker import PositionTracker
+from src.bot.risk_engine import RiskEngine
+from src.bot.token_cache import TokenCache, market_condition_id
+
+
+@dataclass
+class SimOrder:
+    """A resting simulated limit buy"""
+    order_id: str
+    condition_id: str
+    outcome_index: int
+    token_id: str
+    price_ticks: int
+    size: float
+    queue_ahead: float  # size resting at our price before we joined
+    traded_at_level: float = 0.0  # traded at our price, not yet seen leaving the book
+    filled: float = 0.0
+    cost: float = 0.0
+
+    @property
+    def remaining(self) -> float:
+        return self.size - self.filled
+
+    def fill(self, size: float, price_ticks: int):
+        size = min(size, self.remaining)
+        if size > 0:
+            self.filled += size
+            self.cost += size * price_ticks / TICKS_PER_UNIT
+
+
+class SimulatedClient:
+    """
+    Stand-in for ClobClientWrapper that fills limit buys against replayed
+    books and trades with a queue-position model:
+
+    - A new order joins the back of the queue at its price level.
+    - Trades at our price consume the queue ahead of us first, then us.
+    - Size leaving our level beyond what traded there counts as cancels and
+      shrinks the queue ahead pro rata.
+    - Trades below our price, or an ask at/below our price, mean the level
+      was swept - we fill completely.
+    - Only sell-aggressor trades reach our bids. Trades without a side
+      (older recordings) are assumed to be sells, which overstates fills.
+    """
+
+    def __init__(self, starting_balance: float = 1000.0):
+        self.books: Dict[str, OrderBook] = {}
+        self.token_cache = TokenCache(cache_file=None)
+        self.orders: Dict[str, SimOrder] = {}
+        self.orders_by_token: Dict[str, List[SimOrder]] = {}
+        self.balance = starting_balance
+        self._ids = itertools.count(1)
+
+    def add_market(self, market: dict):
+        self.token_cache.put_market(market)
+
+    def _book(self, token_id: str) -> OrderBook:
+        book = self.books.get(token_id)
+        if book is None:
+            book = self.books[token_id] = OrderBook(token_id)
+        return book
+
+    # -- Market data -------------------------------------------------------
+
+    def on_book(self, token_id: str, bids: List[Dict], asks: List[Dict]):
+        """Apply a book snapshot and re-check resting orders"""
+        book = self._book(token_id)
+        before = {o.order_id: book.bids.size_at(o.price_ticks) for o in self.orders_by_token.get(token_id, ())}
+        book.apply_snapshot(bids, asks)
+        self._after_book_change(token_id, book, before)
+
+    def on_price_change(self, token_id: str, side: str, price, size):
+        """Apply one level delta and re-check resting orders"""
+        book = self._book(token_id)
+        before = {o.order_id: book.bids.size_at(o.price_ticks) for o in self.orders_by_token.get(token_id, ())}
+        book.apply_delta(side, price, size)
+        self._after_book_change(token_id, book, before)
+
+    def on_trade(self, token_id: str, price, size: float, side: Optional[str] = None):
+        """A trade printed on this token; `side` is the aggressor's (None = assume SELL)"""
+        if side and side.upper() == 'BUY':
+            return  # lifted asks, our bids untouched
+        trade_ticks = price_to_ticks(price)
+        size = float(size)
+        for order in self.orders_by_token.get(token_id, ()):
+            if order.remaining <= 0:
+                continue
+            if trade_ticks < order.price_ticks:
+                # Traded through our level
+                order.fill(order.remaining, order.price_ticks)
+            elif trade_ticks == order.price_ticks:
+                order.traded_at_level += size
+                consumed = min(order.queue_ahead, size)
+                order.queue_ahead -= consumed
+                order.fill(size - consumed, order.price_ticks)
+
+    def _after_book_change(self, token_id: str, book: OrderBook, before: Dict[str, float]):
+        best_ask = book.asks.best()
+        for order in self.orders_by_token.get(token_id, ()):
+            if order.remaining <= 0:
+                continue
+            if best_ask is not None and best_ask <= order.price_ticks:
+                order.fill(order.remaining, order.price_ticks)
+                continue
+            # Size that left our level: what traded there already consumed
+            # the queue in on_trade; only the rest is cancels
+            old_size = before.get(order.order_id, 0.0)
+            new_size = book.bids.size_at(order.price_ticks)
+            if new_size >= old_size:
+                continue
+            removed = old_size - new_size
+            traded = min(order.traded_at_level, removed)
+            order.traded_at_level -= traded
+            cancelled = removed - traded
+            remaining_level = old_size - traded
+            if cancelled > 0 and remaining_level > 0:
+                order.queue_ahead *= max(0.0, remaining_level - cancelled) / remaining_level
+
+    # -- ClobClientWrapper interface ---------------------------------------
+
+    async def place_order(
+        self,
+        condition_id: str,
+        outcome_index: int,
+        side,
+        order_type,
+        price: Decimal,
+        size: Decimal
+    ) -> Optional[Dict]:
+        token_id = self.token_cache.get(condition_id, outcome_index)
+        if token_id is None:
+            return None
+
+        price_ticks = price_to_ticks(price)
+        book = self._book(token_id)
+        order = SimOrder(
+            order_id=f"sim-{next(self._ids)}",
+            condition_id=condition_id,
+            outcome_index=outcome_index,
+            token_id=token_id,
+            price_ticks=price_ticks,
+            size=float(size),
+            queue_ahead=book.bids.size_at(price_ticks)
+        )
+
+        # Marketable on arrival: take the ask
+        best_ask = book.asks.best()
+        if best_ask is not None and best_ask <= price_ticks:
+            order.fill(min(order.size, book.asks.size_at(best_ask)), best_ask)
+
+        self.orders[order.order_id] = order
+        self.orders_by_token.setdefault(token_id, []).append(order)
+        return {'order_id': order.order_id, 'status': 'live'}
+
+    async def place_orders(self, legs: List[Dict]) -> List[Optional[Dict]]:
+        return [
+            await self.place_order(
+                leg['condition_id'], leg['outcome_index'], leg['side'], None, leg['price'], leg['size']
+            )
+            for leg in legs
+        ]
+
+    async def cancel_all_orders(self, condition_id: str):
+        """Cancel the unfilled remainder of a market's orders"""
+        for order in self.orders.values():
+            if order.condition_id == condition_id:
+                order.size = order.filled
+
+    async def get_open_orders(self, condition_id: Optional[str] = None) -> List[Dict]:
+        return [
+            {'order_id': o.order_id, 'condition_id': o.condition_id, 'remaining': o.remaining}
+            for o in self.orders.values()
+            if o.remaining > 0 and (condition_id is None or o.condition_id == condition_id)
+        ]
+
+    async def get_fills(self, condition_id: str) -> List[Dict]:
+        """One aggregated fill per filled outcome"""
+        per_outcome: Dict[int, List[float]] = {}
+        for order in self.orders.values():
+            if order.condition_id == condition_id and order.filled > 0:
+                size_cost = per_outcome.setdefault(order.outcome_index, [0.0, 0.0])
+                size_cost[0] += order.filled
+                size_cost[1] += order.cost
+        return [
+            {'outcome_index': i, 'price': cost / size, 'size': size}
+            for i, (size, cost) in per_outcome.items()
+        ]
+
+    async def redeem_position(self, condition_id: str, outcome_index: int) -> Dict:
+        return {'success': True}
+
+    async def get_balance(self) -> Dict:
+        return {'usdc': self.balance, 'available': self.balance}
+
+    def close_market(self, condition_id: str):
+        """Forget a resolved market's orders"""
+        for order_id in [i for i, o in self.orders.items() if o.condition_id == condition_id]:
+            order = self.orders.pop(order_id)
+            orders = self.orders_by_token.get(order.token_id, [])
+            if order in orders:
+                orders.remove(order)
+
+
+class EventBacktester:
+    """
+    Drives the real OrderEngine / RiskEngine / PositionTracker against a
+    SimulatedClient over a time-ordered event stream:
+
+        {'type': 'open', 'market': {...}}          market opens, bot may bid
+        {'type': 'book', 'token_id', 'bids', 'asks'}
+        {'type': 'price_change', 'token_id', 'side', 'price', 'size'}
+        {'type': 'trade', 'token_id', 'price', 'size', 'side' (aggressor, optional)}
+        {'type': 'resolve', 'condition_id', 'winner': outcome_index}
+
+    Events may carry a 'ts' (unix seconds) that drives the risk engine's
+    daily reset. The loss circuit breaker is off unless `circuit_breaker`
+    is set, and markets without a 'volume' field are not filtered.
+    """
+
+    def __init__(
+        self,
+        buy_price: Decimal = Decimal('0.45'),
+        max_positions: int = 10,
+        timeframe_name: str = "backtest",
+        initial_capital: Decimal = Decimal('1000'),
+        quiet: bool = True,
+        circuit_breaker: bool = False
+    ):
+        self.initial_capital = initial_capital
+        self.quiet = quiet
+        self.client = SimulatedClient(float(initial_capital))
+        self.engine = OrderEngine(self.client, buy_price, timeframe_name)
+        self.now = datetime.utcfromtimestamp(0)
+        self.risk = RiskEngine(
+            max_positions,
+            timeframe_name,
+            circuit_breaker=circuit_breaker,
+            min_volume=None,
+            clock=lambda: self.now
+        )
+        self.tracker = PositionTracker(timeframe_name, persist=False)
+        self.max_positions = max_positions
+
+        self.capital = initial_capital
+        self.returns: List[float] = []
+        self.one_sided = 0
+        self.unfilled = 0
+        self.skipped = 0
+
+    def run(self, events: Iterable[Dict]) -> BacktestResult:
+        """Run the simulation synchronously"""
+        return asyncio.run(self.run_async(events))
+
+    async def run_async(self, events: Iterable[Dict]) -> BacktestResult:
+        with contextlib.ExitStack() as stack:
+            if self.quiet:
+                devnull = stack.enter_context(open(os.devnull, 'w'))
+                stack.enter_context(contextlib.redirect_stdout(devnull))
+
+            for event in events:
+                await self._handle(event)
+
+        return self._result()
+
+    async def _handle(self, event: Dict):
+        if event.get('ts') is not None:
+            self.now = datetime.utcfromtimestamp(float(event['ts']))
+        kind = event['type']
+        if kind == 'book':
+            self.client.on_book(event['token_id'], event.get('bids', []), event.get('asks', []))
+        elif kind == 'price_change':
+            self.client.on_price_change(event['token_id'], event['side'], event['price'], event['size'])
+        elif kind == 'trade':
+            self.client.on_trade(event['token_id'], event['price'], event['size'], event.get('side'))
+        elif kind == 'open':
+            await self._on_open(event['market'])
+        elif kind == 'resolve':
+            await self._on_resolve(event['condition_id'], event['winner'])
+
+    async def _on_open(self, market: dict):
+        market.setdefault('condition_id', market_condition_id(market))
+        self.client.add_market(market)
+        if self.tracker.has_position(market['condition_id']):
+            return
+        if len(self.tracker.open_positions) >= self.max_positions:
+            self.skipped += 1
+            return
+        if not self.risk.can_place_order(market):
+            self.skipped += 1
+            return
+        if any(await self.engine.place_dual_orders(market)):
+            self.tracker.record_order_placement(market)
+        else:
+            self.skipped += 1
+
+    async def _on_resolve(self, condition_id: str, winner: int):
+        position = self.tracker.positions.get(condition_id)
+        if position is None:
+            self.client.close_market(condition_id)
+            return
+
+        await self.client.cancel_all_orders(condition_id)
+        for fill in await self.client.get_fills(condition_id):
+            self.tracker.record_fill(
+                condition_id,
+                fill['outcome_index'],
+                Decimal(str(fill['price'])),
+                Decimal(str(fill['size']))
+            )
+
+        filled = (position.up_filled, position.down_filled)
+        if not any(filled):
+            self.unfilled += 1
+        elif not all(filled):
+            self.one_sided += 1
+
+        payout = position.up_size if winner == 0 else position.down_size
+        self.tracker.record_redeem(position, payout)
+        pnl = self.tracker.calculate_pnl(position)
+        self.risk.record_result(pnl)
+
+        if any(filled):
+            self.returns.append(float(pnl / self.capital) if self.capital > 0 else 0.0)
+        self.capital += pnl
+        self.client.close_market(condition_id)
+
+    def _result(self) -> BacktestResult:
+        pnls = [
+            self.tracker.calculate_pnl(p)
+            for p in self.tracker.closed_positions
+            if p.up_filled or p.down_filled
+        ]
+
+        equity = self.initial_capital
+        peak = equity
+        max_drawdown = Decimal('0')
+        for pnl in pnls:
+            equity += pnl
+            peak = max(peak, equity)
+            if peak > 0:
+                max_drawdown = max(max_drawdown, (peak - equity) / peak)
+
+        return BacktestResult(
+            total_trades=len(pnls),
+            winning_trades=sum(1 for p in pnls if p > 0),
+            losing_trades=sum(1 for p in pnls if p <= 0),
+            total_profit=sum(pnls, Decimal('0')),
+            max_drawdown=max_drawdown,
+            sharpe_ratio=Decimal(str(round(sharpe_ratio(self.returns), 6))),
+            one_sided_fills=self.one_sided,
+            unfilled_markets=self.unfilled,
+            skipped_markets=self.skipped
+        )
+
+
+def recorded_events(replayer) -> Iterator[Dict]:
+    """
+    Convert a MarketDataReplayer's 'ws' and 'rest.book' records into
+    simulator book/price_change/trade events (merge with open/resolve
+    events by 'ts' before running)
+    """
+    for ts, channel, payload in replayer.iter_records():
+        if channel == 'rest.book':
+            record = codec.loads(payload)
+            book = record.get('book') or {}
+            yield {
+                'type': 'book', 'ts': ts, 'token_id': record['token_id'],
+                'bids': book.get('bids', []), 'asks': book.get('asks', [])
+            }
+            continue
+        if channel != 'ws':
+            continue
+
+        data = codec.loads(payload)
+        for event in data if isinstance(data, list) else [data]:
+            if not isinstance(event, dict):
+                continue
+            event_type = event.get('event_type') or event.get('type')
+            if event_type == 'book':
+                yield {
+                    'type': 'book', 'ts': ts, 'token_id': event.get('asset_id'),
+                    'bids': event.get('bids', []), 'asks': event.get('asks', [])
+                }
+            elif event_type == 'price_change':
+                changes = event.get('price_changes')
+                if changes is None:
+                    changes = [dict(c, asset_id=event.get('asset_id')) for c in event.get('changes', [])]
+                for change in changes:
+                    yield {
+                        'type': 'price_change', 'ts': ts, 'token_id': change.get('asset_id'),
+                        'side': change.get('side', ''), 'price': change['price'], 'size': change['size']
+                    }
+            elif event_type == 'last_trade_price':
+                yield {
+                    'type': 'trade', 'ts': ts, 'token_id': event.get('asset_id'),
+                    'price': event['price'], 'size': event.get('size', 0),
+                    'side': event.get('side')
+                }
+
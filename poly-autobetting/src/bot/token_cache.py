@@ -0,0 +1,110 @@
+"""
+Token Cache - condition_id -> outcome token IDs, persisted to disk
+"""
+from typing import Dict, List, Optional, Tuple
+import json
+import os
+
+
+def extract_token_ids(market: dict) -> List[str]:
+    """Get outcome token IDs from a Gamma market, in outcome order"""
+    tokens = market.get('tokens')
+    if tokens:
+        return [t.get('token_id') for t in tokens if t.get('token_id')]
+
+    # Gamma also ships them as a JSON-encoded string list
+    clob_ids = market.get('clobTokenIds')
+    if isinstance(clob_ids, str):
+        try:
+            clob_ids = json.loads(clob_ids)
+        except ValueError:
+            return []
+    return [str(t) for t in clob_ids] if clob_ids else []
+
+
+def market_condition_id(market: dict) -> Optional[str]:
+    """Condition ID of a Gamma market (snake or camel case)"""
+    return market.get('condition_id') or market.get('conditionId')
+
+
+class TokenCache:
+    """Caches outcome token IDs per market so order placement skips Gamma"""
+
+    def __init__(self, cache_file: Optional[str] = "token_cache.json", max_entries: int = 5000):
+        """
+        Args:
+            cache_file: JSON snapshot path (None disables persistence)
+            max_entries: Oldest markets are evicted beyond this many
+        """
+        self.cache_file = cache_file
+        self.max_entries = max_entries
+        self.tokens: Dict[str, List[str]] = {}  # condition_id -> token IDs
+        self.by_token: Dict[str, Tuple[str, int]] = {}  # token_id -> (condition_id, index)
+        self._dirty = False
+        self.load()
+
+    def get(self, condition_id: str, outcome_index: int) -> Optional[str]:
+        """Get the token ID for a market outcome, if cached"""
+        tokens = self.tokens.get(condition_id)
+        if tokens and outcome_index < len(tokens):
+            return tokens[outcome_index]
+        return None
+
+    def lookup_token(self, token_id: str) -> Optional[Tuple[str, int]]:
+        """Reverse lookup: token ID -> (condition_id, outcome_index)"""
+        return self.by_token.get(token_id)
+
+    def put(self, condition_id: str, token_ids: List[str]):
+        """Cache token IDs for a market (token IDs never change once issued)"""
+        if not token_ids or self.tokens.get(condition_id) == token_ids:
+            return
+
+        self.tokens[condition_id] = list(token_ids)
+        for i, token_id in enumerate(token_ids):
+            self.by_token[token_id] = (condition_id, i)
+        self._dirty = True
+
+        while len(self.tokens) > self.max_entries:
+            oldest = next(iter(self.tokens))
+            for token_id in self.tokens.pop(oldest):
+                self.by_token.pop(token_id, None)
+
+    def put_market(self, market: dict):
+        """Cache token IDs from a Gamma market dict"""
+        condition_id = market_condition_id(market)
+        if condition_id:
+            self.put(condition_id, extract_token_ids(market))
+
+    def warm(self, markets: List[Dict]):
+        """Warm the cache from an already-fetched market list"""
+        for market in markets:
+            self.put_market(market)
+        self.save()
+
+    def save(self):
+        """Persist the cache to disk if it changed"""
+        if not self.cache_file or not self._dirty:
+            return
+
+        try:
+            tmp_file = f"{self.cache_file}.tmp"
+            with open(tmp_file, 'w') as f:
+                json.dump({'tokens': self.tokens}, f)
+            os.replace(tmp_file, self.cache_file)
+            self._dirty = False
+        except Exception as e:
+            print(f"Failed to save token cache: {e}")
+
+    def load(self):
+        """Load the cache snapshot from disk"""
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+
+        try:
+            with open(self.cache_file, 'r') as f:
+                data = json.load(f)
+            for condition_id, token_ids in data.get('tokens', {}).items():
+                self.put(condition_id, token_ids)
+            self._dirty = False
+        except Exception as e:
+            print(f"Failed to load token cache: {e}")
@@ -0,0 +1,215 @@
+# User Fill Feed
+"""
+Real-time order and fill events from the CLOB user WebSocket channel
+"""
+import asyncio
+import random
+from collections import OrderedDict
+from typing import Callable, Dict, Iterable, List, Optional
+import websockets
+
+from src.api import codec
+from src.bot.fill_monitor import FillMonitor
+
+
+class UserFillFeed:
+    """
+    Pushes our fills into FillMonitor and the PositionTrackers as they
+    match, instead of waiting for the next polling cycle.
+
+    WebSocket events can be missed across reconnects, so every
+    `reconcile_interval` seconds the trackers also pull trades over REST
+    from their cursor; both paths dedup on trade id.
+    """
+
+    def __init__(
+        self,
+        client,
+        endpoint: str = "wss://ws-subscriptions-clob.polymarket.com/ws/user",
+        fill_monitor: Optional[FillMonitor] = None,
+        reconcile_interval: float = 30.0
+    ):
+        """
+        Args:
+            client: ClobClientWrapper (API creds + trade normalization)
+            endpoint: User channel endpoint
+            fill_monitor: Receives every new fill
+            reconcile_interval: Seconds between REST reconciliations
+        """
+        self.client = client
+        self.endpoint = endpoint
+        self.fill_monitor = fill_monitor or FillMonitor()
+        self.reconcile_interval = reconcile_interval
+        self.trackers: List = []
+        self.on_order: Optional[Callable] = None  # order placement/update/cancel events
+
+        self.ws = None
+        self.running = False
+        self.markets = set()  # condition_ids subscribed
+        self._seen: OrderedDict = OrderedDict()  # trade id -> pushed (True) / failed (False)
+        self._tasks: List[asyncio.Task] = []
+
+        # Reconnect with jittered exponential backoff
+        self.reconnect_delay = 0.5
+        self.max_reconnect_delay = 30
+        self.reconnect_attempts = 0
+        self.reconnects = 0
+        self.fills_pushed = 0
+        self.fills_reversed = 0
+        self.reconciled_fills = 0
+
+    @property
+    def connected(self) -> bool:
+        return self.ws is not None
+
+    def add_tracker(self, tracker):
+        """Route fills into a PositionTracker"""
+        self.trackers.append(tracker)
+
+    async def connect(self):
+        """Connect and listen, reconnecting until stopped"""
+        while self.running:
+            try:
+                self.ws = await websockets.connect(self.endpoint)
+                print("User feed connected")
+                self.reconnect_attempts = 0
+                await self._send_auth()
+                await self._listen()
+            except Exception as e:
+                print(f"User feed error: {e}")
+
+            self.ws = None
+            if self.running:
+                self.reconnects += 1
+                await asyncio.sleep(self._next_backoff())
+
+    def _next_backoff(self) -> float:
+        """Full-jitter exponential backoff"""
+        ceiling = min(self.max_reconnect_delay, self.reconnect_delay * 2 ** self.reconnect_attempts)
+        self.reconnect_attempts += 1
+        return random.uniform(0, ceiling)
+
+    async def _send_auth(self):
+        await self.ws.send(codec.dumps({
+            'type': 'user',
+            'auth': {
+                'apiKey': self.client.api_key,
+                'secret': self.client.api_secret,
+                'passphrase': self.client.passphrase,
+            },
+            'markets': sorted(self.markets),
+        }))
+
+    async def watch(self, condition_ids: Iterable[str]):
+        """Also receive events for these markets"""
+        new = [c for c in condition_ids if c not in self.markets]
+        if not new:
+            return
+        self.markets.update(new)
+        if self.ws:
+            await self.ws.send(codec.dumps({'markets': new, 'operation': 'subscribe'}))
+
+    async def _listen(self):
+        try:
+            async for message in self.ws:
+                self.dispatch(message)
+        except websockets.exceptions.ConnectionClosed:
+            print("User feed disconnected")
+
+    def dispatch(self, message):
+        """Decode one frame and handle its events"""
+        data = codec.loads(message)
+        for event in data if isinstance(data, list) else [data]:
+            if not isinstance(event, dict):
+                continue
+            event_type = event.get('event_type')
+            if event_type == 'trade':
+                self._on_trade(event)
+            elif event_type == 'order' and self.on_order:
+                self.on_order(event)
+
+    def _on_trade(self, event: Dict):
+        """
+        Push a trade's fills on the first status seen (MATCHED); a later
+        FAILED status takes back fills already pushed
+        """
+        trade = dict(event)
+        match_time = int(trade.get('match_time') or trade.get('matchtime') or trade.get('timestamp') or 0)
+        trade['match_time'] = match_time // 1000 if match_time > 10 ** 12 else match_time
+        if 'trader_side' not in trade:
+            own_maker = any(self.client.is_own_order(m) for m in trade.get('maker_orders', []))
+            trade['trader_side'] = 'MAKER' if own_maker else 'TAKER'
+
+        failed = (trade.get('status') or '').upper() == 'FAILED'
+        for fill in self.client.normalize_trade(trade):
+            if failed:
+                self._on_failed(fill)
+                continue
+            if fill['trade_id'] in self._seen:
+                continue
+            self._remember(fill['trade_id'], True)
+
+            self.fills_pushed += 1
+            self.fill_monitor.process_fill(dict(
+                fill,
+                order_id=fill['trade_id'],
+                timestamp=fill['match_time']
+            ))
+            for tracker in self.trackers:
+                tracker.record_trade(fill)
+
+    def _on_failed(self, fill: Dict):
+        if self._seen.get(fill['trade_id']) is False:
+            return  # already reversed
+        self._remember(fill['trade_id'], False)
+        if self.fill_monitor.remove_fill(fill['trade_id']):
+            self.fills_reversed += 1
+        for tracker in self.trackers:
+            tracker.record_trade(fill)
+
+    def _remember(self, trade_id: str, pushed: bool):
+        """trade_id -> True once pushed, False once failed"""
+        self._seen[trade_id] = pushed
+        self._seen.move_to_end(trade_id)
+        if len(self._seen) > 5000:
+            self._seen.popitem(last=False)
+
+    async def _reconcile_loop(self):
+        """Catch fills the socket missed"""
+        while self.running:
+            await asyncio.sleep(self.reconcile_interval)
+            await self.reconcile()
+
+    async def reconcile(self):
+        """Pull trades over REST for every tracker"""
+        for tracker in self.trackers:
+            try:
+                self.reconciled_fills += await tracker.update_positions(self.client)
+            except Exception as e:
+                print(f"User feed reconcile error: {e}")
+
+    def start(self):
+        """Start the socket and the reconcile loop"""
+        self.running = True
+        self._tasks = [
+            asyncio.create_task(self.connect()),
+            asyncio.create_task(self._reconcile_loop()),
+        ]
+
+    def stop(self):
+        """Stop the feed"""
+        self.running = False
+        for task in self._tasks:
+            task.cancel()
+        if self.ws:
+            asyncio.create_task(self.ws.close())
+
+    def stats(self) -> Dict:
+        return {
+            'connected': self.connected,
+            'markets': len(self.markets),
+            'fills_pushed': self.fills_pushed,
+            'fills_reversed': self.fills_reversed,
+            'reconciled_fills': self.reconciled_fills,
+            'reconnects': self.reconnects,
+        }
@@ -0,0 +1,326 @@
+# Vector Backtest
+"""
+Columnar NumPy backtest kernel for parameter sweeps
+"""
+import os
+from dataclasses import dataclass, field
+from decimal import Decimal
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.bot.backtest import BacktestResult
+
+
+@dataclass
+class MarketArrays:
+    """
+    Historical markets as columns (M markets)
+
+    Fills come from either price paths or fill probabilities:
+    - up_path (M, T): UP token price over each market's life, NaN-padded.
+      DOWN is taken as 1 - UP. A bid at p fills once the path trades <= p.
+    - up_fill_prob / down_fill_prob: (M,) or (M, E) per entry price.
+      P&L is then the expectation over the four fill combinations.
+
+    `window` (M,) optionally groups markets that trade at the same time,
+    so a max-positions cap can be applied per window.
+    """
+    winner: np.ndarray  # (M,) 0 = UP won, 1 = DOWN won
+    up_path: Optional[np.ndarray] = None
+    up_fill_prob: Optional[np.ndarray] = None
+    down_fill_prob: Optional[np.ndarray] = None
+    window: Optional[np.ndarray] = None
+
+    _COLUMNS = ('winner', 'up_path', 'up_fill_prob', 'down_fill_prob', 'window')
+
+    def __post_init__(self):
+        self.winner = np.asarray(self.winner, dtype=np.int8)
+        if self.up_path is not None:
+            self.up_path = np.asarray(self.up_path, dtype=np.float64)
+        elif self.up_fill_prob is None or self.down_fill_prob is None:
+            raise ValueError("MarketArrays needs up_path or both fill probabilities")
+
+    def __len__(self) -> int:
+        return len(self.winner)
+
+    def subset(self, mask: np.ndarray) -> 'MarketArrays':
+        """Markets selected by a boolean mask or index array"""
+        return MarketArrays(**{
+            name: getattr(self, name)[mask] if getattr(self, name) is not None else None
+            for name in self._COLUMNS
+        })
+
+    def capped(self, max_positions: int) -> 'MarketArrays':
+        """First `max_positions` markets of each window (all if no windows)"""
+        if self.window is None:
+            return self
+        order = np.argsort(self.window, kind='stable')
+        windows = self.window[order]
+        starts = np.r_[0, np.flatnonzero(windows[1:] != windows[:-1]) + 1]
+        rank = np.arange(len(order)) - np.repeat(starts, np.diff(np.r_[starts, len(order)]))
+        return self.subset(np.sort(order[rank < max_positions]))
+
+    def save(self, directory: str):
+        """Write each column as <directory>/<name>.npy"""
+        os.makedirs(directory, exist_ok=True)
+        for name in self._COLUMNS:
+            column = getattr(self, name)
+            if column is not None:
+                np.save(os.path.join(directory, f"{name}.npy"), column)
+
+    @classmethod
+    def load(cls, directory: str, mmap: bool = True) -> 'MarketArrays':
+        """Load columns saved by save(), memory-mapped by default"""
+        columns = {}
+        for name in cls._COLUMNS:
+            path = os.path.join(directory, f"{name}.npy")
+            if os.path.exists(path):
+                columns[name] = np.load(path, mmap_mode='r' if mmap else None)
+        return cls(**columns)
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> 'MarketArrays':
+        """
+        Build from dicts with 'winner' plus either 'up_prices' (list) or
+        'up_fill_prob' / 'down_fill_prob', and optionally 'window'
+        """
+        winner = np.array([r['winner'] for r in records], dtype=np.int8)
+        window = None
+        if records and 'window' in records[0]:
+            window = np.array([r['window'] for r in records], dtype=np.int64)
+        if records and 'up_prices' in records[0]:
+            width = max(len(r['up_prices']) for r in records)
+            path = np.full((len(records), width), np.nan)
+            for i, r in enumerate(records):
+                path[i, :len(r['up_prices'])] = r['up_prices']
+            return cls(winner, up_path=path, window=window)
+        return cls(
+            winner,
+            up_fill_prob=np.array([r['up_fill_prob'] for r in records], dtype=np.float64),
+            down_fill_prob=np.array([r['down_fill_prob'] for r in records], dtype=np.float64),
+            window=window
+        )
+
+
+# Metrics where smaller is better; everything else ranks largest first
+LOWER_IS_BETTER = {'max_drawdown', 'one_sided', 'unfilled'}
+
+
+def metric_sign(metric: str) -> int:
+    """+1 if larger `metric` values are better, -1 if smaller are"""
+    return -1 if metric in LOWER_IS_BETTER else 1
+
+
+@dataclass
+class SweepResult:
+    """Metrics on the entry price x stop-loss x size grid, each shaped (E, S, Z)"""
+    entry_prices: np.ndarray
+    stop_losses: List[Optional[float]]
+    sizes: np.ndarray
+    total_profit: np.ndarray
+    trades: np.ndarray
+    wins: np.ndarray
+    one_sided: np.ndarray
+    unfilled: np.ndarray
+    max_drawdown: np.ndarray
+    sharpe: np.ndarray
+    pnl: np.ndarray = field(repr=False)  # (E, S, M) per-market P&L at size 1
+
+    def ranked(self, metric: str = 'sharpe') -> List[Dict]:
+        """Grid points as dicts, best `metric` first"""
+        values = getattr(self, metric) * metric_sign(metric)
+        rows = []
+        for e, s, z in zip(*np.unravel_index(np.argsort(-values, axis=None, kind='stable'), values.shape)):
+            rows.append({
+                'entry_price': float(self.entry_prices[e]),
+                'stop_loss': self.stop_losses[s],
+                'size': float(self.sizes[z]),
+                'total_profit': float(self.total_profit[e, s, z]),
+                'trades': int(self.trades[e, s, z]),
+                'wins': int(self.wins[e, s, z]),
+                'one_sided': int(self.one_sided[e, s, z]),
+                'unfilled': int(self.unfilled[e, s, z]),
+                'max_drawdown': float(self.max_drawdown[e, s, z]),
+                'sharpe': float(self.sharpe[e, s, z]),
+            })
+        return rows
+
+    def result(self, e: int = 0, s: int = 0, z: int = 0) -> BacktestResult:
+        """One grid point as a BacktestResult"""
+        trades = int(self.trades[e, s, z])
+        wins = int(self.wins[e, s, z])
+        return BacktestResult(
+            total_trades=trades,
+            winning_trades=wins,
+            losing_trades=trades - wins,
+            total_profit=Decimal(str(round(float(self.total_profit[e, s, z]), 6))),
+            max_drawdown=Decimal(str(round(float(self.max_drawdown[e, s, z]), 6))),
+            sharpe_ratio=Decimal(str(round(float(self.sharpe[e, s, z]), 6))),
+            one_sided_fills=int(self.one_sided[e, s, z]),
+            unfilled_markets=int(self.unfilled[e, s, z])
+        )
+
+
+def _path_fills(data: MarketArrays, price: float, stop_loss: Optional[float]):
+    """Per-market (pnl, up_filled, down_filled, won) from price paths at one entry price"""
+    up = data.up_path
+    down = 1.0 - up
+    with np.errstate(invalid='ignore'):
+        up_hit = up <= price
+        down_hit = down <= price
+    up_filled = up_hit.any(axis=1)
+    down_filled = down_hit.any(axis=1)
+
+    up_won = data.winner == 0
+    both = up_filled & down_filled
+    only_up = up_filled & ~down_filled
+    only_down = down_filled & ~up_filled
+
+    pnl = np.zeros(len(data))
+    pnl[both] = 1.0 - 2 * price
+    pnl[only_up] = np.where(up_won[only_up], 1.0 - price, -price)
+    pnl[only_down] = np.where(up_won[only_down], -price, 1.0 - price)
+
+    if stop_loss is not None:
+        # One-sided leg stopped out if its price later trades at entry - stop_loss
+        stop = price - stop_loss
+        width = up.shape[1]
+        cols = np.arange(width)
+        up_first = np.where(up_filled, up_hit.argmax(axis=1), width)
+        down_first = np.where(down_filled, down_hit.argmax(axis=1), width)
+        with np.errstate(invalid='ignore'):
+            up_stopped = ((up <= stop) & (cols > up_first[:, None])).any(axis=1) & only_up
+            down_stopped = ((down <= stop) & (cols > down_first[:, None])).any(axis=1) & only_down
+        pnl[up_stopped | down_stopped] = -stop_loss
+
+    return pnl, up_filled, down_filled, pnl > 0
+
+
+def _prob_fills(data: MarketArrays, index: int, price: float, stop_loss: Optional[float]):
+    """Per-market expected (pnl, P(up), P(down), P(win)) from fill probabilities"""
+    pu = data.up_fill_prob
+    pd = data.down_fill_prob
+    if pu.ndim == 2:
+        pu = pu[:, index]
+    if pd.ndim == 2:
+        pd = pd[:, index]
+
+    # Without a path a stop-loss simply caps the losing one-sided leg
+    loss = min(price, stop_loss) if stop_loss is not None else price
+    up_won = data.winner == 0
+    up_only = np.where(up_won, 1.0 - price, -loss)
+    down_only = np.where(up_won, -loss, 1.0 - price)
+
+    pnl = (
+        pu * pd * (1.0 - 2 * price)
+        + pu * (1 - pd) * up_only
+        + pd * (1 - pu) * down_only
+    )
+    won = (
+        pu * pd * (1.0 - 2 * price > 0)
+        + pu * (1 - pd) * (up_only > 0)
+        + pd * (1 - pu) * (down_only > 0)
+    )
+    return pnl, pu, pd, won
+
+
+def _drawdown(equity: np.ndarray, initial_capital: float) -> np.ndarray:
+    """Max drawdown fraction along the last axis (the peak starts at initial_capital)"""
+    peak = np.maximum(np.maximum.accumulate(equity, axis=-1), initial_capital)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        dd = np.where(peak > 0, (peak - equity) / peak, 0.0)
+    return dd.max(axis=-1)
+
+
+def _size_metrics(pnl: np.ndarray, traded: np.ndarray, size: float, initial_capital: float):
+    """(total profit, max drawdown, Sharpe), each (E, S), for one order size"""
+    scaled = pnl * size
+    equity = initial_capital + np.cumsum(scaled, axis=-1)
+    prior = np.empty_like(equity)
+    prior[..., 0] = initial_capital
+    prior[..., 1:] = equity[..., :-1]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        returns = np.where(prior > 0, scaled / prior, 0.0)
+    del prior
+
+    # Sharpe over markets with any fill (weighted by fill probability)
+    weight = traded[:, None, :]
+    n = traded.sum(axis=-1)[:, None]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = (returns * weight).sum(axis=-1) / n
+        returns -= mean[..., None]
+        var = (weight * returns ** 2).sum(axis=-1) / (n - 1)
+        sharpe = np.where((n > 1) & (var > 0), mean / np.sqrt(var), 0.0)
+
+    return scaled.sum(axis=-1), _drawdown(equity, initial_capital), sharpe
+
+
+def run_sweep(
+    data: MarketArrays,
+    entry_prices: Sequence[float],
+    stop_losses: Sequence[Optional[float]] = (None,),
+    sizes: Sequence[float] = (1.0,),
+    initial_capital: float = 1000.0
+) -> SweepResult:
+    """
+    Evaluate every (entry price, stop-loss, size) combination
+
+    Per-market P&L is computed once per (entry, stop) across all markets;
+    equity curves, drawdown and Sharpe are then batched over all (entry,
+    stop) pairs, one size at a time.
+
+    Args:
+        data: Historical markets
+        entry_prices: Candidate limit prices for both legs
+        stop_losses: Per-share stop distance below entry (None = hold)
+        sizes: Shares per leg
+        initial_capital: Starting equity for drawdown/returns
+    """
+    entry_prices = np.asarray(entry_prices, dtype=np.float64)
+    stop_losses = list(stop_losses)
+    sizes = np.asarray(sizes, dtype=np.float64)
+    n_e, n_s, n_m = len(entry_prices), len(stop_losses), len(data)
+
+    pnl = np.zeros((n_e, n_s, n_m))
+    won = np.zeros((n_e, n_s, n_m))
+    p_up = np.zeros((n_e, n_m))
+    p_down = np.zeros((n_e, n_m))
+    for e, price in enumerate(entry_prices):
+        for s, stop_loss in enumerate(stop_losses):
+            if data.up_path is not None:
+                pnl[e, s], up, down, won[e, s] = _path_fills(data, price, stop_loss)
+            else:
+                pnl[e, s], up, down, won[e, s] = _prob_fills(data, e, price, stop_loss)
+        p_up[e], p_down[e] = up, down
+
+    # Fill counts do not depend on stop-loss or size
+    traded = 1 - (1 - p_up) * (1 - p_down)
+    one_sided = (p_up * (1 - p_down) + p_down * (1 - p_up)).sum(axis=1)
+    unfilled = n_m - traded.sum(axis=1)
+
+    # One size at a time keeps peak memory at a few (E, S, M) arrays
+    grid = (n_e, n_s, len(sizes))
+    total_profit = np.zeros(grid)
+    max_drawdown = np.zeros(grid)
+    sharpe = np.zeros(grid)
+    for z, size in enumerate(sizes):
+        total_profit[..., z], max_drawdown[..., z], sharpe[..., z] = _size_metrics(
+            pnl, traded, size, initial_capital
+        )
+
+    wins = np.broadcast_to(won.sum(axis=-1)[:, :, None], grid).round()
+
+    return SweepResult(
+        entry_prices=entry_prices,
+        stop_losses=stop_losses,
+        sizes=sizes,
+        total_profit=total_profit,
+        trades=np.broadcast_to(traded.sum(axis=1)[:, None, None], grid).round(),
+        wins=wins,
+        one_sided=np.broadcast_to(one_sided[:, None, None], grid).round(),
+        unfilled=np.broadcast_to(unfilled[:, None, None], grid).round(),
+        max_drawdown=max_drawdown,
+        sharpe=sharpe,
+        pnl=pnl
+    )
@@ -3,49 +3,264 @@
 Real-time WebSocket order book feed with auto-reconnect
 """
 import asyncio
-import json
-from typing import Callable, Optional
+import random
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
 import websockets
 
+from src.api import codec
+
+
+OVERFLOW_DROP_OLDEST = 'drop_oldest'
+OVERFLOW_CONFLATE = 'conflate'
+
+
+def event_token_ids(event: Dict) -> set:
+    """Tokens an event touches (price_change events can carry several)"""
+    if 'price_changes' in event:
+        return {c.get('asset_id') for c in event['price_changes']}
+    return {event.get('asset_id')}
+
+
+class FeedSubscription:
+    """
+    Bounded async queue for one feed consumer
+    
+    The reader never blocks on a consumer: when the queue is full the
+    oldest message is dropped. With the 'conflate' policy a pending full
+    'book' snapshot for the same token is replaced by the newer one, so a
+    slow consumer only ever sees the latest book; deltas are never merged.
+    
+    Dropping any message (a delta, or a snapshot the deltas after it
+    build on) leaves a consumer's book wrong, so the tokens it touched
+    are collected in `stale_tokens` for the consumer to resync.
+    """
+    
+    def __init__(
+        self,
+        token_id: Optional[str] = None,
+        channel: Optional[str] = None,
+        maxsize: int = 1000,
+        overflow: str = OVERFLOW_DROP_OLDEST
+    ):
+        """
+        Args:
+            token_id: Only messages for this token (None = all tokens)
+            channel: Only this event type, e.g. 'book' (None = all)
+            maxsize: Queue bound
+            overflow: 'drop_oldest' or 'conflate'
+        """
+        if overflow not in (OVERFLOW_DROP_OLDEST, OVERFLOW_CONFLATE):
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        
+        self.token_id = token_id
+        self.channel = channel
+        self.maxsize = maxsize
+        self.overflow = overflow
+        self.delivered = 0
+        self.dropped = 0
+        self.conflated = 0
+        self.stale_tokens: set = set()
+        self.closed = False
+        self._pending: OrderedDict = OrderedDict()
+        self._seq = 0
+        self._ready = asyncio.Event()
+    
+    def __len__(self) -> int:
+        return len(self._pending)
+    
+    def put_nowait(self, token_id: Optional[str], event_type: Optional[str], message):
+        """Enqueue without ever blocking the reader"""
+        if self.closed:
+            return
+        
+        if self.overflow == OVERFLOW_CONFLATE and event_type == 'book':
+            key = (token_id, event_type)
+            if key in self._pending:
+                self.conflated += 1
+                del self._pending[key]
+        else:
+            self._seq += 1
+            key = self._seq
+        
+        if len(self._pending) >= self.maxsize:
+            dropped_key, dropped = self._pending.popitem(last=False)
+            self.dropped += 1
+            if isinstance(dropped, dict):
+                self.stale_tokens.update(t for t in event_token_ids(dropped) if t)
+            if isinstance(dropped_key, tuple) and dropped_key[0]:
+                self.stale_tokens.add(dropped_key[0])
+        
+        self._pending[key] = message
+        self._ready.set()
+    
+    async def get(self):
+        """Wait for the next message (None once closed and drained)"""
+        while not self._pending:
+            if self.closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        
+        _, message = self._pending.popitem(last=False)
+        self.delivered += 1
+        return message
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        message = await self.get()
+        if message is None:
+            raise StopAsyncIteration
+        return message
+    
+    def take_stale(self) -> set:
+        """Tokens with messages dropped since the last call"""
+        stale, self.stale_tokens = self.stale_tokens, set()
+        return stale
+    
+    def close(self):
+        self.closed = True
+        self._ready.set()
+    
+    def stats(self) -> Dict:
+        return {
+            'token_id': self.token_id,
+            'channel': self.channel,
+            'queued': len(self._pending),
+            'delivered': self.delivered,
+            'dropped': self.dropped,
+            'conflated': self.conflated,
+            'stale_tokens': len(self.stale_tokens),
+        }
+
 
 class WebSocketBookFeed:
     """WebSocket feed for real-time order book data"""
     
-    def __init__(self, endpoint: str = "wss://clob.polymarket.com/ws"):
+    def __init__(
+        self,
+        endpoint: str = "wss://clob.polymarket.com/ws",
+        name: str = "WebSocket",
+        subscribe_batch_size: int = 100
+    ):
         self.endpoint = endpoint
+        self.name = name  # for logging
         self.ws = None
         self.running = False
         self.subscriptions = set()
-        self.on_message: Optional[Callable] = None
-        self.reconnect_delay = 5  # seconds
+        self.on_message: Optional[Callable] = None  # called inline - keep it fast
+        self.consumers: Dict[Tuple[Optional[str], Optional[str]], List[FeedSubscription]] = {}
+        self.subscribe_batch_size = subscribe_batch_size
+        self.recorder = None  # MarketDataRecorder tees raw frames to disk
+        
+        # Reconnect with jittered exponential backoff
+        self.reconnect_delay = 0.5  # seconds, first retry
+        self.max_reconnect_delay = 30  # seconds
+        self.reconnect_attempts = 0
+        self.reconnects = 0
     
     async def connect(self):
         """Connect to WebSocket"""
         while self.running:
             try:
                 self.ws = await websockets.connect(self.endpoint)
-                print("WebSocket connected")
+                print(f"{self.name} connected")
+                self.reconnect_attempts = 0
                 
-                # Resubscribe to previous subscriptions
-                for token_id in self.subscriptions:
-                    await self._subscribe(token_id)
+                # Resubscribe to previous subscriptions in batches
+                await self._subscribe_batch(list(self.subscriptions))
                 
                 # Listen for messages
                 await self._listen()
                 
             except Exception as e:
-                print(f"WebSocket error: {e}")
-                await asyncio.sleep(self.reconnect_delay)
+                print(f"{self.name} error: {e}")
+            
+            self.ws = None
+            if self.running:
+                self.reconnects += 1
+                await asyncio.sleep(self._next_backoff())
+    
+    def _next_backoff(self) -> float:
+        """Full-jitter exponential backoff"""
+        ceiling = min(self.max_reconnect_delay, self.reconnect_delay * 2 ** self.reconnect_attempts)
+        self.reconnect_attempts += 1
+        return random.uniform(0, ceiling)
     
     async def _listen(self):
         """Listen for WebSocket messages"""
         try:
             async for message in self.ws:
-                data = json.loads(message)
-                if self.on_message:
-                    self.on_message(data)
+                if self.recorder:
+                    self.recorder.record('ws', message)
+                self.dispatch(message)
         except websockets.exceptions.ConnectionClosed:
-            print("WebSocket disconnected")
+            print(f"{self.name} disconnected")
+    
+    def dispatch(self, message):
+        """Decode one raw frame and deliver it (also used by the replayer)"""
+        data = codec.loads(message)
+        if self.on_message:
+            self.on_message(data)
+        if self.consumers:
+            self._fan_out(data)
+    
+    def add_consumer(
+        self,
+        token_id: Optional[str] = None,
+        channel: Optional[str] = None,
+        maxsize: int = 1000,
+        overflow: str = OVERFLOW_DROP_OLDEST
+    ) -> FeedSubscription:
+        """Register a consumer with its own bounded queue"""
+        consumer = FeedSubscription(token_id, channel, maxsize, overflow)
+        self.consumers.setdefault((channel, token_id), []).append(consumer)
+        return consumer
+    
+    def remove_consumer(self, consumer: FeedSubscription):
+        """Unregister a consumer and close its queue"""
+        key = (consumer.channel, consumer.token_id)
+        consumers = self.consumers.get(key, [])
+        if consumer in consumers:
+            consumers.remove(consumer)
+            if not consumers:
+                del self.consumers[key]
+        consumer.close()
+    
+    def _fan_out(self, data):
+        """Route each event to the matching consumers' queues"""
+        events = data if isinstance(data, list) else [data]
+        for event in events:
+            if not isinstance(event, dict):
+                continue
+            event_type = event.get('event_type') or event.get('type')
+            
+            token_ids = event_token_ids(event)
+            
+            delivered = set()
+            for token_id in token_ids:
+                for key in (
+                    (event_type, token_id),
+                    (event_type, None),
+                    (None, token_id),
+                    (None, None)
+                ):
+                    for consumer in self.consumers.get(key, ()):
+                        if id(consumer) not in delivered:
+                            delivered.add(id(consumer))
+                            consumer.put_nowait(token_id, event_type, event)
+    
+    def consumer_stats(self) -> Dict:
+        """Queue counters across all consumers"""
+        consumers = [c for group in self.consumers.values() for c in group]
+        return {
+            'consumers': len(consumers),
+            'dropped': sum(c.dropped for c in consumers),
+            'conflated': sum(c.conflated for c in consumers),
+            'per_consumer': [c.stats() for c in consumers],
+        }
     
     async def subscribe(self, token_id: str):
         """Subscribe to a token's order book"""
@@ -56,17 +271,35 @@ class WebSocketBookFeed:
     async def _subscribe(self, token_id: str):
         """Send subscription message"""
         if self.ws:
-            await self.ws.send(json.dumps({
+            await self.ws.send(codec.dumps({
                 'type': 'subscribe',
                 'channel': 'book',
                 'token_id': token_id
             }))
     
+    async def subscribe_many(self, token_ids: List[str]):
+        """Subscribe to several tokens with batched messages"""
+        new = [t for t in token_ids if t not in self.subscriptions]
+        self.subscriptions.update(new)
+        if self.ws:
+            await self._subscribe_batch(new)
+    
+    async def _subscribe_batch(self, token_ids: List[str]):
+        """Send subscriptions `subscribe_batch_size` tokens per message"""
+        if not self.ws:
+            return
+        for i in range(0, len(token_ids), self.subscribe_batch_size):
+            await self.ws.send(codec.dumps({
+                'type': 'subscribe',
+                'channel': 'book',
+                'token_ids': token_ids[i:i + self.subscribe_batch_size]
+            }))
+    
     async def unsubscribe(self, token_id: str):
         """Unsubscribe from a token"""
         self.subscriptions.discard(token_id)
         if self.ws:
-            await self.ws.send(json.dumps({
+            await self.ws.send(codec.dumps({
                 'type': 'unsubscribe',
                 'channel': 'book',
                 'token_id': token_id
@@ -80,5 +313,8 @@ class WebSocketBookFeed:
     def stop(self):
         """Stop the WebSocket connection"""
         self.running = False
+        for consumers in self.consumers.values():
+            for consumer in consumers:
+                consumer.close()
         if self.ws:
             asyncio.create_task(self.ws.close())
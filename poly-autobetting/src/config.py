@@ -27,3 +27,11 @@ class Config:
     # Timing
     ORDER_CHECK_INTERVAL = 10  # seconds
     MARKET_ROTATION_BUFFER = 60  # seconds before expiry to rotate
+
+    # HTTP transport (shared keep-alive pool)
+    HTTP_TIMEOUT = float(os.getenv('HTTP_TIMEOUT', '30'))  # seconds
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '10'))  # seconds
+    HTTP_MAX_CONNECTIONS_PER_HOST = int(os.getenv('HTTP_MAX_CONNECTIONS_PER_HOST', '10'))
+    HTTP_MAX_KEEPALIVE_PER_HOST = int(os.getenv('HTTP_MAX_KEEPALIVE_PER_HOST', '5'))
+    HTTP_KEEPALIVE_EXPIRY = float(os.getenv('HTTP_KEEPALIVE_EXPIRY', '60'))  # seconds
+    HTTP2_ENABLED = os.getenv('HTTP2_ENABLED', 'false').lower() == 'true'  # needs `h2`
@@ -3,35 +3,102 @@
 Order book and spread monitoring
 """
 import asyncio
-from typing import Dict, Optional, Callable
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Callable
 from decimal import Decimal
 
+import numpy as np
+
 from src.api.clob import ClobAPI
+from src.bot.fixed_point import price_to_ticks, spread_bps
+from src.bot.order_book import OrderBook, OrderBookManager
+from src.bot.ws_book_feed import WebSocketBookFeed
 
 
 class MarketMonitor:
     """Monitors market conditions"""
     
-    def __init__(self):
+    def __init__(
+        self,
+        book_manager: Optional[OrderBookManager] = None,
+        stale_after: float = 15.0,
+        fallback_interval: float = 1.0
+    ):
+        """
+        Args:
+            book_manager: Local books fed by the WebSocket stream
+            stale_after: Seconds without a stream update before REST fallback
+            fallback_interval: Seconds between staleness checks in streaming mode
+        """
         self.clob = ClobAPI()
+        self.book_manager = book_manager or OrderBookManager(self.clob)
+        self.stale_after = stale_after
+        self.fallback_interval = fallback_interval
         self.callbacks: Dict[str, Callable] = {}
         self.running = False
+        self.feed: Optional[WebSocketBookFeed] = None
+        self.rest_fallbacks = 0
     
     async def start_monitoring(self, token_ids: List[str]):
-        """Start monitoring given tokens"""
+        """Start monitoring given tokens by polling REST"""
         self.running = True
         
         while self.running:
-            for token_id in token_ids:
-                try:
-                    book = await self.clob.get_order_book(token_id)
-                    if book:
-                        self._process_book(token_id, book)
-                except Exception as e:
-                    print(f"Monitor error for {token_id}: {e}")
-            
+            await self._fetch_books(token_ids)
             await asyncio.sleep(5)  # 5 second refresh
     
+    async def start_streaming(self, token_ids: List[str], feed: Optional[WebSocketBookFeed] = None):
+        """
+        Start monitoring given tokens from the WebSocket book feed
+        
+        Callbacks fire on every book change. Tokens whose stream goes quiet
+        for `stale_after` seconds are refreshed over REST, concurrently.
+        """
+        self.running = True
+        self.feed = feed or WebSocketBookFeed()
+        self.book_manager.attach(self.feed)
+        self.book_manager.add_listener(self._on_book_update)
+        
+        for token_id in token_ids:
+            await self.feed.subscribe(token_id)
+        if not self.feed.running:
+            self.feed.start()
+        
+        while self.running:
+            stale = [t for t in token_ids if self._is_stale(t)]
+            if stale:
+                self.rest_fallbacks += len(stale)
+                await self._fetch_books(stale, into_books=True)
+            await asyncio.sleep(self.fallback_interval)
+    
+    def _is_stale(self, token_id: str) -> bool:
+        book = self.book_manager.get_book(token_id)
+        if book is None:
+            return True
+        age = book.age()
+        return age is None or age > self.stale_after
+    
+    async def _fetch_books(self, token_ids: List[str], into_books: bool = False):
+        """Fetch `/book` for several tokens concurrently"""
+        results = await asyncio.gather(
+            *[self.clob.get_order_book(t) for t in token_ids],
+            return_exceptions=True
+        )
+        for token_id, book in zip(token_ids, results):
+            if isinstance(book, Exception):
+                print(f"Monitor error for {token_id}: {book}")
+            elif book and into_books:
+                # Listener fires the callback from the refreshed local book
+                self.book_manager.apply_rest_snapshot(token_id, book)
+            elif book:
+                self._process_book(token_id, book)
+    
+    def _on_book_update(self, token_id: str, book: OrderBook):
+        """Local book changed (stream delta, snapshot or REST fallback)"""
+        if token_id in self.callbacks and book.valid:
+            self._process_book(token_id, book.to_dict())
+    
     def _process_book(self, token_id: str, book: Dict):
         """Process order book data"""
         if token_id in self.callbacks:
@@ -44,14 +111,60 @@ class MarketMonitor:
     def stop(self):
         """Stop monitoring"""
         self.running = False
+        if self.feed:
+            self.feed.stop()
+
+
+@dataclass
+class SpreadStats:
+    """One batch pass over every monitored token (arrays in slot order)"""
+    token_ids: List[str]
+    spread_ticks: np.ndarray
+    spread_bps: np.ndarray
+    percentiles: Dict[int, np.ndarray]  # rolling spread_bps percentiles
+    ok: np.ndarray  # both sides quoted and within max_spread
+
+    @property
+    def spread_pct(self) -> np.ndarray:
+        return self.spread_bps / 10_000
+
+    def wide(self) -> List[str]:
+        """Tokens currently failing the check"""
+        return [self.token_ids[i] for i in np.flatnonzero(~self.ok)]
 
 
 class SpreadMonitor:
     """Monitors bid-ask spreads"""
     
-    def __init__(self, max_spread: Decimal = Decimal('0.02')):
+    def __init__(
+        self,
+        max_spread: Decimal = Decimal('0.02'),
+        history: int = 120,
+        percentiles: tuple = (50, 90),
+        max_alerts: int = 256
+    ):
+        """
+        Args:
+            max_spread: Widest acceptable spread (relative to the bid)
+            history: Batch passes kept for rolling percentiles
+            percentiles: Percentiles of spread_bps reported per token
+            max_alerts: Alerts kept (oldest dropped first)
+        """
         self.max_spread = max_spread
-        self.alerts: List[str] = []
+        # max_spread as an exact fraction: spreads are compared in integers
+        self._max_num, self._max_den = Decimal(str(max_spread)).as_integer_ratio()
+        self.history = history
+        self.percentiles = percentiles
+        self.alerts: deque = deque(maxlen=max_alerts)
+        self.alerting = set()  # tokens already alerted until their spread recovers
+        
+        # Batch mode: best bid/ask ticks per token slot (0 = side empty)
+        self.token_ids: List[str] = []
+        self.slots: Dict[str, int] = {}
+        self.bids = np.zeros(0, dtype=np.int64)
+        self.asks = np.zeros(0, dtype=np.int64)
+        self._history = np.full((history, 0), np.nan)
+        self._passes = 0
     
     def check_spread(self, token_id: str, book: Dict) -> bool:
         """Check if spread is within acceptable range"""
@@ -61,15 +174,106 @@ class SpreadMonitor:
         if not bids or not asks:
             return False
         
-        best_bid = Decimal(str(bids[0]['price']))
-        best_ask = Decimal(str(asks[0]['price']))
+        best_bid = price_to_ticks(bids[0]['price'])
+        best_ask = price_to_ticks(asks[0]['price'])
         
-        spread = best_ask - best_bid
-        spread_pct = spread / best_bid if best_bid > 0 else Decimal('0')
-        
-        if spread_pct > self.max_spread:
-            alert = f"Wide spread on {token_id}: {spread_pct:.2%}"
-            self.alerts.append(alert)
+        if best_bid > 0 and self._too_wide(best_bid, best_ask):
+            self._alert(token_id, best_bid, best_ask)
             return False
         
+        self.alerting.discard(token_id)
         return True
+    
+    def _too_wide(self, bid_ticks, ask_ticks):
+        """(ask - bid) / bid > max_spread, exactly (bps alone round down)"""
+        return (ask_ticks - bid_ticks) * self._max_den > self._max_num * bid_ticks
+    
+    def _alert(self, token_id: str, bid_ticks: int, ask_ticks: int):
+        """Record one alert per token per wide-spread episode"""
+        if token_id in self.alerting:
+            return
+        self.alerting.add(token_id)
+        bps = -(-(ask_ticks - bid_ticks) * 10_000 // bid_ticks)  # rounded up, so never shows as within max_spread
+        self.alerts.append(f"Wide spread on {token_id}: {bps / 10_000:.2%}")
+    
+    # -- Batch mode ---------------------------------------------------------
+    
+    def track(self, token_ids: List[str]):
+        """Add tokens to the batch arrays"""
+        new = [t for t in dict.fromkeys(token_ids) if t not in self.slots]
+        if not new:
+            return
+        for token_id in new:
+            self.slots[token_id] = len(self.token_ids)
+            self.token_ids.append(token_id)
+        pad = np.zeros(len(new), dtype=np.int64)
+        self.bids = np.concatenate([self.bids, pad])
+        self.asks = np.concatenate([self.asks, pad])
+        self._history = np.hstack([self._history, np.full((self.history, len(new)), np.nan)])
+    
+    def attach(self, book_manager: OrderBookManager):
+        """Keep the batch arrays current from local book updates"""
+        book_manager.add_listener(self.on_book_update)
+    
+    def on_book_update(self, token_id: str, book: OrderBook):
+        slot = self.slots.get(token_id)
+        if slot is not None:
+            # An invalidated book counts as unquoted until it resyncs
+            self.bids[slot] = (book.bids.best() or 0) if book.valid else 0
+            self.asks[slot] = (book.asks.best() or 0) if book.valid else 0
+    
+    def update(self, token_id: str, book: Dict):
+        """Set a token's top of book from a REST/dict book"""
+        slot = self.slots.get(token_id)
+        if slot is None:
+            return
+        bids = book.get('bids', [])
+        asks = book.get('asks', [])
+        self.bids[slot] = price_to_ticks(bids[0]['price']) if bids else 0
+        self.asks[slot] = price_to_ticks(asks[0]['price']) if asks else 0
+    
+    def check_all(self) -> SpreadStats:
+        """
+        Spreads for every tracked token in one pass; records the pass in
+        the rolling history and raises alerts for newly wide spreads
+        """
+        quoted = (self.bids > 0) & (self.asks > 0)
+        ticks = np.where(quoted, self.asks - self.bids, 0)
+        bps = spread_bps(self.bids, np.where(quoted, self.asks, self.bids))
+        ok = quoted & ~self._too_wide(self.bids, self.asks)
+        
+        self._history[self._passes % self.history] = np.where(quoted, bps, np.nan)
+        self._passes += 1
+        rolling = self._rolling_percentiles(self._history[:min(self._passes, self.history)])
+        
+        for i in np.flatnonzero(quoted & ~ok):
+            self._alert(self.token_ids[i], int(self.bids[i]), int(self.asks[i]))
+        if self.alerting:
+            self.alerting.difference_update(self.token_ids[i] for i in np.flatnonzero(ok))
+        
+        return SpreadStats(
+            token_ids=self.token_ids,
+            spread_ticks=ticks,
+            spread_bps=bps,
+            percentiles=rolling,
+            ok=ok
+        )
+    
+    def _rolling_percentiles(self, window: np.ndarray) -> Dict[int, np.ndarray]:
+        """
+        Linear-interpolated percentiles per column ignoring NaN (unquoted
+        passes); NaN sorts last, so one sort serves every percentile
+        """
+        ordered = np.sort(window, axis=0)
+        count = (~np.isnan(window)).sum(axis=0)
+        last = np.maximum(count - 1, 0)
+        result = {}
+        for q in self.percentiles:
+            rank = last * (q / 100)
+            lo = np.floor(rank).astype(np.int64)
+            hi = np.minimum(lo + 1, last)
+            low = np.take_along_axis(ordered, lo[None], axis=0)[0]
+            high = np.take_along_axis(ordered, hi[None], axis=0)[0]
+            value = low + (high - low) * (rank - lo)
+            result[q] = np.where(count > 0, value, np.nan)
+        return result